@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""Local JSON query API over the build's screening data.
+
+Loads data/movies.json once into in-memory indexes and answers queries from
+them, reloading only when a new build replaces the file. Example:
+
+    python api.py
+    curl 'localhost:8765/screenings?date=2026-02-07&after=8:00pm&format=35mm'
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from build import load_data, showtime_minutes
+
+DATA_FILE = Path(__file__).parent / 'data' / 'movies.json'
+DEFAULT_PORT = 8765
+
+# How often to check whether a new build has replaced the data file, in seconds
+RELOAD_INTERVAL = 2
+
+_index_lock = threading.Lock()
+
+
+def normalize(text):
+    """Lowercase and strip punctuation for index keys."""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', (text or '').lower()).split())
+
+
+def build_index(movies, mtime=None):
+    """Build the in-memory indexes for a list of screenings.
+
+    Rows are referenced by their position in `movies`. Besides exact-match
+    indexes by date, theater, format and film, showtimes are kept as sorted
+    (minutes, row, time) lists per date for range queries, and title words
+    are kept sorted for prefix search.
+    """
+    by_date = defaultdict(set)
+    by_theater = defaultdict(set)
+    by_format = defaultdict(set)
+    by_film = defaultdict(set)
+    by_word = defaultdict(set)
+    showtimes = defaultdict(list)
+
+    for i, movie in enumerate(movies):
+        by_date[movie.get('date')].add(i)
+        by_theater[normalize(movie.get('theater'))].add(i)
+        by_format[normalize(movie.get('format'))].add(i)
+        film = normalize(movie.get('title'))
+        by_film[film].add(i)
+        for word in film.split():
+            by_word[word].add(i)
+
+        for time_str in movie.get('times') or []:
+            minutes = showtime_minutes(time_str)
+            if minutes is not None:
+                showtimes[movie.get('date')].append((minutes, i, time_str))
+                showtimes[None].append((minutes, i, time_str))
+
+    for entries in showtimes.values():
+        entries.sort()
+
+    return {
+        'movies': movies,
+        'mtime': mtime,
+        'loaded_at': time.time(),
+        'by_date': dict(by_date),
+        'by_theater': dict(by_theater),
+        'by_format': dict(by_format),
+        'by_film': dict(by_film),
+        'by_word': dict(by_word),
+        'words': sorted(by_word),
+        'showtimes': dict(showtimes),
+    }
+
+
+# Swapped for a loaded index by reload_if_changed()
+_index = build_index([])
+
+
+def load_index(data_file=DATA_FILE):
+    """Load data_file and build a fresh index from it."""
+    mtime = os.stat(data_file).st_mtime
+    return build_index(load_data(data_file), mtime)
+
+
+def get_index():
+    """Return the current index (swapped atomically on reload)."""
+    with _index_lock:
+        return _index
+
+
+def reload_if_changed(data_file=DATA_FILE):
+    """Rebuild the index if data_file changed since it was loaded. Returns True on reload."""
+    global _index
+    try:
+        mtime = os.stat(data_file).st_mtime
+    except OSError:
+        return False
+    current = get_index()
+    if current['mtime'] == mtime:
+        return False
+
+    index = load_index(data_file)
+    with _index_lock:
+        _index = index
+    print(f"Loaded {len(index['movies'])} screenings from {data_file}")
+    return True
+
+
+def watch(data_file=DATA_FILE, interval=RELOAD_INTERVAL):
+    """Poll data_file and hot-reload the index whenever a new build lands."""
+    while True:
+        time.sleep(interval)
+        try:
+            reload_if_changed(data_file)
+        except (OSError, ValueError) as e:
+            # A half-written file; try again next time round
+            print(f"Reload failed: {e}")
+
+
+def search_words(index, query):
+    """Rows whose title has a word starting with each word of the query."""
+    words = index['words']
+    result = None
+    for prefix in normalize(query).split():
+        matches = set()
+        for word in words[bisect_left(words, prefix):]:
+            if not word.startswith(prefix):
+                break
+            matches |= index['by_word'][word]
+        result = matches if result is None else result & matches
+        if not result:
+            break
+    return result or set()
+
+
+def query_screenings(index, date=None, theater=None, format=None, film=None, q=None,
+                     after=None, before=None):
+    """Return screenings matching every given filter.
+
+    `after`/`before` bound the showtime (inclusive, e.g. "8:00pm"); when
+    either is given, each row's times are narrowed to the ones in range.
+    """
+    candidates = None
+
+    def narrow(ids):
+        nonlocal candidates
+        candidates = set(ids) if candidates is None else candidates & ids
+
+    if date:
+        narrow(index['by_date'].get(date, set()))
+    if theater:
+        narrow(index['by_theater'].get(normalize(theater), set()))
+    if format:
+        narrow(index['by_format'].get(normalize(format), set()))
+    if film:
+        narrow(index['by_film'].get(normalize(film), set()))
+    if q:
+        narrow(search_words(index, q))
+
+    movies = index['movies']
+
+    if after is None and before is None:
+        ids = range(len(movies)) if candidates is None else sorted(candidates)
+        return [movies[i] for i in ids]
+
+    low = showtime_minutes(after) if after else 0
+    high = showtime_minutes(before) if before else 24 * 60
+    if low is None or high is None:
+        raise ValueError('after/before must look like "8:00pm"')
+
+    entries = index['showtimes'].get(date, [])
+    start = bisect_left(entries, (low,))
+    end = bisect_right(entries, (high, float('inf')))
+
+    times = defaultdict(list)
+    for _, i, time_str in entries[start:end]:
+        if candidates is None or i in candidates:
+            times[i].append(time_str)
+
+    return [dict(movies[i], times=times[i]) for i in sorted(times)]
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves /screenings, /films, /theaters and /health as JSON."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        index = get_index()
+
+        started = time.perf_counter()
+        try:
+            if url.path == '/screenings':
+                allowed = {'date', 'theater', 'format', 'film', 'q', 'after', 'before'}
+                results = query_screenings(index, **{k: v for k, v in params.items() if k in allowed})
+                body = {'count': len(results), 'screenings': results}
+            elif url.path == '/films':
+                ids = search_words(index, params['q']) if params.get('q') else range(len(index['movies']))
+                body = {'films': sorted({index['movies'][i]['title'] for i in ids})}
+            elif url.path == '/theaters':
+                body = {'theaters': sorted({m['theater'] for m in index['movies']})}
+            elif url.path == '/health':
+                body = {'screenings': len(index['movies']), 'loaded_at': index['loaded_at']}
+            else:
+                self.send_json(404, {'error': f'unknown path {url.path}'})
+                return
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+
+        body['query_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        self.send_json(200, body)
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    """Load the data, start the reload watcher and serve."""
+    parser = argparse.ArgumentParser(description='Serve the screening data as a local JSON API.')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--data', type=Path, default=DATA_FILE, help='screening data to serve')
+    args = parser.parse_args(argv)
+
+    reload_if_changed(args.data)
+    threading.Thread(target=watch, args=(args.data,), daemon=True).start()
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), Handler)
+    print(f"Serving on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Scaling benchmarks for the build stages on synthetic schedules.
+
+Generates realistic screening sets at several multiples of a normal week
+(~300 screenings) and times each build stage on them, with peak memory from
+tracemalloc. The growth column compares each run with the previous scale, so
+anything growing faster than the data shows up as super-linear. Example:
+
+    python bench.py --scales 1 10 100
+"""
+import argparse
+import contextlib
+import io
+import logging
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from build import (
+    CHICAGO_TZ, TEMPLATE_DIR, filter_to_week, group_by_date, time_sort_key, generate_html,
+)
+
+# Screenings per theater per day in a typical week
+SCREENINGS_PER_DAY = 6
+
+WORDS = [
+    'night', 'city', 'river', 'last', 'summer', 'blue', 'house', 'stranger', 'winter', 'love',
+    'dark', 'garden', 'letter', 'train', 'mirror', 'ghost', 'paris', 'harbor', 'silent', 'empire',
+    'dream', 'passion', 'shadow', 'return', 'journey', 'amélie', 'café', 'wild', 'golden', 'year',
+]
+
+FORMATS = ['35mm', '70mm', 'DCP', '16mm', 'Digital']
+
+
+def showtime(rng, minutes):
+    """Format a showtime the various ways theaters write them."""
+    hour, minute = divmod(minutes, 60)
+    suffix = 'pm' if hour >= 12 else 'am'
+    hour12 = hour % 12 or 12
+    style = rng.random()
+    if style < 0.5:
+        return f"{hour12}:{minute:02d} {suffix.upper()}"
+    if style < 0.8:
+        return f"{hour12}:{minute:02d}{suffix}"
+    if style < 0.95:
+        return f"{hour12}:{minute:02d} {suffix}"
+    return 'See website'
+
+
+def synthetic_movies(theaters=7, days=7, films=None, per_day=SCREENINGS_PER_DAY, missing=0.3, seed=0):
+    """Generate a screening list in the scraper schema.
+
+    `films` is the size of the title pool (default: enough for every theater
+    to show mostly different films). `missing` is the chance each optional
+    field (format, director, year, times) is absent, as with real scrapers.
+    """
+    rng = random.Random(seed)
+    films = films or max(10, theaters * per_day * 2)
+
+    titles = []
+    for i in range(films):
+        words = rng.sample(WORDS, rng.randint(1, 4))
+        title = ' '.join(words).title()
+        if rng.random() < 0.1:
+            title += f": Part {rng.randint(1, 3)}"
+        # Repeated titles, as with remakes and retitled prints
+        titles.append((f"{title} {i}" if rng.random() < 0.9 else title,
+                       rng.randint(1920, 2025), f"Director {rng.randint(1, films // 2 + 1)}"))
+
+    today = datetime.now(CHICAGO_TZ).date()
+    movies = []
+    for t in range(theaters):
+        theater = f"Theater {t + 1}"
+        url = f"https://theater{t + 1}.example.com"
+        for day in range(days):
+            date = (today + timedelta(days=day)).strftime('%Y-%m-%d')
+            for _ in range(per_day):
+                title, year, director = rng.choice(titles)
+                times = sorted(rng.sample(range(10 * 60, 23 * 60, 5), rng.randint(1, 4)))
+                movies.append({
+                    'title': title,
+                    'theater': theater,
+                    'theater_url': url,
+                    'address': f"{rng.randint(100, 9999)} N Example Ave",
+                    'date': date,
+                    'times': [] if rng.random() < missing / 5 else [showtime(rng, m) for m in times],
+                    'format': rng.choice(FORMATS) if rng.random() > missing else None,
+                    'director': director if rng.random() > missing else None,
+                    'year': year if rng.random() > missing else None,
+                    'ticket_url': f"{url}/films/{rng.randint(1, 10**6)}",
+                })
+    return movies
+
+
+def enrich_offline(movies):
+    """Run the Letterboxd enrichment bookkeeping against a warm in-memory cache (no requests)."""
+    from scrapers import catalog, letterboxd
+
+    letterboxd._cache = {}
+    for movie in movies:
+        key = f"{movie['title']}|{movie['year']}" if movie.get('year') else movie['title']
+        letterboxd._cache[key] = {
+            'letterboxd_url': f"https://letterboxd.com/film/{abs(hash(key))}/",
+            'title': movie['title'], 'director': movie.get('director'), 'rating': '3.8',
+            'tagline': None, 'description': None, 'poster': None,
+        }
+    # Keep the real catalog out of it
+    catalog.CATALOG_FILE = Path(tempfile.gettempdir()) / 'bench-film-catalog.json'
+    catalog._films = {}
+    catalog._by_title = {}
+    catalog._by_word = {}
+    return letterboxd.enrich_movies_with_letterboxd([dict(m) for m in movies])
+
+
+def render(movies, out_dir):
+    """Render the site (cold fragment cache) into a scratch directory."""
+    generate_html(movies, TEMPLATE_DIR, Path(out_dir) / 'index.html')
+
+
+STAGES = [
+    ('filter_to_week', lambda movies, out: filter_to_week(movies)),
+    ('group_by_date', lambda movies, out: group_by_date(movies)),
+    ('time_sort_key', lambda movies, out: sorted(movies, key=time_sort_key)),
+    ('enrich', lambda movies, out: enrich_offline(movies)),
+    ('render', render),
+]
+
+
+def measure(fn, *args):
+    """Return (seconds, peak MB allocated) for fn.
+
+    Timed and traced in separate runs, since tracemalloc slows allocation-heavy code.
+    """
+    started = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main(argv=None):
+    """Generate each scale, run every stage on it and print the curves."""
+    parser = argparse.ArgumentParser(description='Benchmark the build stages on synthetic schedules.')
+    parser.add_argument('--scales', nargs='+', type=int, default=[1, 10, 100],
+                        help='multiples of a normal week to generate, via more theaters (default: 1 10 100)')
+    parser.add_argument('--theaters', type=int, default=7, help='theaters at scale 1 (default: 7)')
+    parser.add_argument('--days', type=int, default=7, help='days of schedule (default: 7)')
+    parser.add_argument('--films', type=int, help='size of the title pool (default: scales with theaters)')
+    parser.add_argument('--missing', type=float, default=0.3,
+                        help='chance each optional field is missing (default: 0.3)')
+    parser.add_argument('--stages', nargs='+', choices=[name for name, _ in STAGES], metavar='STAGE',
+                        help='only run these stages')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    # Silence the build's progress output while timing
+    logging.disable(logging.INFO)
+
+    stages = [(name, fn) for name, fn in STAGES if not args.stages or name in args.stages]
+    previous = {}
+
+    # Warm-up pass so imports and template compilation aren't charged to the first scale
+    warmup = synthetic_movies(1, 1, seed=args.seed)
+    for _, fn in stages:
+        with tempfile.TemporaryDirectory() as out, contextlib.redirect_stdout(io.StringIO()):
+            fn(warmup, out)
+
+    print(f"{'stage':<16}{'scale':>7}{'rows':>9}{'seconds':>11}{'peak MB':>10}{'growth':>9}")
+    for scale in args.scales:
+        movies = synthetic_movies(args.theaters * scale, args.days, args.films,
+                                  missing=args.missing, seed=args.seed)
+        for name, fn in stages:
+            with tempfile.TemporaryDirectory() as out, contextlib.redirect_stdout(io.StringIO()):
+                elapsed, peak = measure(fn, movies, out)
+
+            # Time growth relative to data growth: ~1.0 is linear, well above is super-linear
+            growth = ''
+            if name in previous:
+                prev_rows, prev_elapsed = previous[name]
+                growth = f"{(elapsed / prev_elapsed) / (len(movies) / prev_rows):.2f}x"
+            previous[name] = (len(movies), elapsed)
+            print(f"{name:<16}{scale:>7}{len(movies):>9}{elapsed:>11.4f}{peak:>10.1f}{growth:>9}")
+
+
+if __name__ == '__main__':
+    main()
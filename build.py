@@ -1,33 +1,125 @@
 #!/usr/bin/env python3
 """Build script for Chicago Art House Cinema website."""
+import argparse
+import filecmp
+import gzip
+import hashlib
 import json
 import os
+import re
+import signal
 import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, deque
 from pathlib import Path
 try:
     from zoneinfo import ZoneInfo
 except ImportError:
     from backports.zoneinfo import ZoneInfo
 
-CHICAGO_TZ = ZoneInfo('America/Chicago')
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
-from jinja2 import Environment, FileSystemLoader
+CHICAGO_TZ = ZoneInfo('America/Chicago')
 
 # Add scrapers to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from scrapers import (
-    scrape_doc_films,
-    scrape_music_box,
-    scrape_logan,
-    scrape_facets,
-    scrape_siskel,
-    scrape_alamo,
-    scrape_davis
+from scrapers import available_scrapers, available_markets, market_scrapers, load_scraper, DEFAULT_MARKET
+from scrapers.utils import (
+    set_deadline, deadline_passed, time_remaining, save_parse_cache, set_horizon, horizon_days,
+    fetch_failures, HORIZON_DAYS, write_json_atomic, shutdown_parse_pool, horizon_end,
 )
-from scrapers.letterboxd import enrich_movies_with_letterboxd
+
+# Default wall-clock budget for a full build, in seconds
+DEFAULT_TIME_BUDGET = 15 * 60
+
+BASE_DIR = Path(__file__).parent
+TEMPLATE_DIR = BASE_DIR / 'templates'
+
+# Daemon refresh cadence per theater key, in seconds
+REFRESH_INTERVALS = {
+    'siskel': 6 * 3600,
+    'doc_films': 12 * 3600,
+    'music_box': 3 * 3600,
+    'logan': 3 * 3600,
+    'facets': 12 * 3600,
+    'alamo': 3600,
+    'davis': 3 * 3600,
+}
+DEFAULT_REFRESH_INTERVAL = 6 * 3600
+
+# Hard limits for scrapers run with --isolate: wall-clock seconds (also
+# capped by the build deadline, plus a grace period for the scraper to
+# notice it) and resident memory of the scraper's process and all of its
+# descendants, Chromium included
+SCRAPER_TIMEOUT = 5 * 60
+SCRAPER_DEADLINE_GRACE = 15
+SCRAPER_MAX_RSS_MB = 1024
+
+# How many times a failed market shard is re-queued before giving up
+SHARD_RETRIES = 1
+
+# data/movies.json format: 1 is a flat list of screenings, 2 is normalize_movies()
+DATA_VERSION = 2
+
+# Per-screening keys stored in the normalized format; anything else is kept as extras
+SCREENING_FIELDS = ['film', 'theater', 'date', 'times', 'format', 'ticket_url']
+MOVIE_KEYS = {'title', 'theater', 'theater_url', 'address', 'date', 'times', 'format',
+              'director', 'year', 'ticket_url', 'letterboxd'}
+
+# Schedule change feed written next to movies.json and published with the site,
+# keeping this many change sets (newest last)
+CHANGES_NAME = 'changes.json'
+CHANGES_KEEP = 60
+
+# Niceness increment for --prefetch runs
+PREFETCH_NICENESS = 10
+
+# Static assets referenced from pages under a content-hashed name
+FINGERPRINT_ASSETS = ['styles.css']
+
+# Outputs that get precompressed .gz (and .br, with brotli installed) siblings
+COMPRESS_SUFFIXES = {'.html', '.css', '.js', '.json', '.xml', '.txt'}
+
+# Subdirectory of each site directory holding the per-film pages
+FILMS_DIR = 'films'
+# Longest film page name in characters (before .html), well inside filesystem limits
+FILM_SLUG_MAX = 100
+
+# Text-only listings page for slow connections, and its gzipped size budget
+LITE_PAGE = 'lite.html'
+LITE_BUDGET_BYTES = 30 * 1024
+
+# Rules for these selectors (the header, filter bar, Today section and
+# screening rows) are inlined by --optimize; the rest of the stylesheet loads
+# without blocking first paint
+CRITICAL_SELECTORS = (
+    ':root', '*', 'html', 'body', 'header', 'main', '.header-nav', '.week-', '.updated',
+    '.search', '.theater-filter', '.filter-btn', '.tonight-', '.screening', '.film-',
+)
+
+# Elements whose contents the HTML minifier leaves alone
+RAW_TEXT_TAGS = ('script', 'style', 'pre', 'textarea')
+
+# Block-level tags; whitespace next to them is never rendered, so the minifier drops it
+BLOCK_TAGS = (
+    'html', 'head', 'body', 'meta', 'link', 'title', 'script', 'style', 'noscript', 'header',
+    'main', 'footer', 'nav', 'section', 'div', 'ul', 'li', 'p', 'h1', 'h2', 'h3', 'h4', 'button',
+)
+
+# Per-directory record of output hashes, for deploying only what changed
+MANIFEST_NAME = 'manifest.json'
+
+# index.html shows the first this many days, starting today; any further days
+# are split into week-N.html pages of this many days each
+PAGE_DAYS = 7
 
 
 def format_day(date_str):
@@ -40,89 +132,520 @@ def format_day(date_str):
 
 
 def filter_to_week(movies):
-    """Filter movies to only include this week (next 7 days)."""
+    """Filter movies to the schedule window (see horizon_end; 7 days by default)."""
     today = datetime.now(CHICAGO_TZ).date()
-    week_end = today + timedelta(days=7)
+    end = horizon_end()
 
     filtered = []
     for movie in movies:
         try:
             movie_date = datetime.strptime(movie['date'], '%Y-%m-%d').date()
-            if today <= movie_date <= week_end:
+            if today <= movie_date < end:
                 filtered.append(movie)
         except (ValueError, TypeError):
             continue
     return filtered
 
 
-def run_scrapers():
-    """Run all scrapers and collect movies."""
+SCRAPER_KEYS = available_scrapers()
+MARKET_KEYS = available_markets()
+
+
+def select_scrapers(only=None, skip=None, market=DEFAULT_MARKET):
+    """Return the market's scraper keys to run given --only/--skip keys."""
+    selected = []
+    for key in market_scrapers(market):
+        if only and key not in only:
+            continue
+        if skip and key in skip:
+            continue
+        selected.append(key)
+    return selected
+
+
+def run_scrapers(keys=None, upcoming_path=None, isolate=False, jobs=1, on_scraped=None):
+    """Run scrapers and collect movies.
+
+    Returns (movies, scraped_theaters) where scraped_theaters is the set of
+    theater names whose scraper completed without raising or losing any
+    fetches (a failed request, an open circuit, the deadline). A partial
+    scrape's rows are still returned, but its theater keeps its last saved
+    screenings too (see merge_with_previous). With an
+    upcoming_path, titles the scrapers saw beyond the horizon are recorded
+    there for --prefetch before they are filtered out. With `isolate`, each
+    scraper runs in its own process under hard time and memory limits
+    (see run_isolated), up to `jobs` at a time. `on_scraped` is called with
+    each scraper's in-window screenings as soon as that scraper finishes.
+    """
     all_movies = []
+    scraped_theaters = set()
+
+    if keys is None:
+        keys = SCRAPER_KEYS
+
+    results = run_isolated(keys, jobs) if isolate else run_in_process(keys)
+    for name, movies, lost in results:
+        all_movies.extend(movies)
+        if lost:
+            print(f"  {name}: {lost} fetches failed - keeping its last saved screenings as well")
+        else:
+            scraped_theaters.add(name)
+            # Some scrapers (e.g. Alamo) cover several venues from one source
+            scraped_theaters.update(m['theater'] for m in movies)
+        if on_scraped:
+            on_scraped(filter_to_week(movies))
+
+    save_parse_cache()
+
+    if upcoming_path:
+        save_upcoming(all_movies, upcoming_path)
+
+    # Filter to current week only
+    all_movies = filter_to_week(all_movies)
+    print(f"\nFiltered to {len(all_movies)} screenings this week")
+
+    return all_movies, scraped_theaters
 
-    scrapers = [
-        ('Gene Siskel', scrape_siskel),
-        ('Doc Films', scrape_doc_films),
-        ('Music Box', scrape_music_box),
-        ('Logan Theatre', scrape_logan),
-        ('Facets', scrape_facets),
-        ('Alamo Drafthouse', scrape_alamo),
-        ('Davis Theater', scrape_davis),
-    ]
 
-    for name, scraper in scrapers:
+def run_in_process(keys):
+    """Run scrapers one after another in this process.
+
+    Yields (theater name, movies, fetches lost) for each scraper that returns.
+    """
+    for key in keys:
+        name = key
+        if deadline_passed():
+            print(f"Build deadline reached - skipping {key}")
+            continue
         try:
+            scraper, info = load_scraper(key)
+            name = info['name']
             print(f"Scraping {name}...")
+            failures = fetch_failures()
             movies = scraper()
-            all_movies.extend(movies)
             print(f"  Found {len(movies)} screenings")
+            yield name, movies, fetch_failures() - failures
         except Exception as e:
             print(f"  Error scraping {name}: {e}")
 
-    # Filter to current week only
-    all_movies = filter_to_week(all_movies)
-    print(f"\nFiltered to {len(all_movies)} screenings this week")
 
-    return all_movies
+def scrape_in_child(key, days, remaining, conn):
+    """Worker process body for run_isolated(): run one scraper and send back its results."""
+    # Own process group for helpers it starts; Chromium makes its own session, so
+    # run_isolated also tracks the whole descendant tree (see process_tree)
+    os.setsid()
+    set_horizon(days)
+    if remaining is not None:
+        set_deadline(max(0.001, remaining))
+    try:
+        scraper, info = load_scraper(key)
+        movies = scraper()
+        save_parse_cache()
+        conn.send(('ok', info['name'], movies, fetch_failures()))
+    except Exception as e:
+        conn.send(('error', key, str(e), 0))
+    finally:
+        conn.close()
+
+
+def process_tree(pid):
+    """PIDs of a process and all of its descendants, found through /proc (None where it isn't available).
+
+    Walks parent links rather than process groups, since Chromium starts in
+    a session of its own.
+    """
+    proc = Path('/proc')
+    if not proc.is_dir():
+        return None
+    children = defaultdict(list)
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            # Fields after the parenthesised command: state, ppid, ...
+            stat = (entry / 'stat').read_text()
+            children[int(stat[stat.rindex(')') + 2:].split()[1])].append(int(entry.name))
+        except (OSError, ValueError, IndexError):
+            continue
+
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def tree_rss_mb(pid):
+    """Resident memory of a process and its descendants, in MB (None where /proc isn't available)."""
+    pids = process_tree(pid)
+    if pids is None:
+        return None
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    total = 0
+    for child in pids:
+        try:
+            total += int(Path(f'/proc/{child}/statm').read_text().split()[1]) * page_size
+        except (OSError, ValueError, IndexError):
+            continue
+    return total / 1024 / 1024
+
+
+def signal_pids(pids, sig):
+    """Send a signal to each PID, ignoring ones that have already gone."""
+    for pid in pids:
+        try:
+            os.kill(pid, sig)
+        except OSError:
+            pass
+
+
+def kill_tree(process):
+    """SIGKILL a scraper process, its process group and every descendant (any browser included)."""
+    # Freeze the tree first so nothing in it can start another process, then
+    # walk it again to catch anything started in the meantime
+    pids = process_tree(process.pid) or []
+    signal_pids(pids, signal.SIGSTOP)
+    signal_pids(set(pids) | set(process_tree(process.pid) or []), signal.SIGKILL)
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (OSError, AttributeError):
+        process.kill()
+    process.join()
+
+
+def run_isolated(keys, jobs=1, timeout=SCRAPER_TIMEOUT, max_rss_mb=SCRAPER_MAX_RSS_MB):
+    """Run each scraper in its own process, yielding (theater name, movies, fetches lost) for each success.
+
+    A scraper still running after `timeout` seconds (or shortly after the
+    build deadline), or whose process tree (any browser it started
+    included) grows past `max_rss_mb`, is killed along with that tree and
+    reported; the others carry on, up to `jobs` at a time.
+    """
+    import multiprocessing
+    from multiprocessing.connection import wait as wait_for
+
+    pending = deque(keys)
+    running = {}  # connection -> (key, process, kill time)
+
+    while pending or running:
+        while pending and len(running) < max(1, jobs):
+            key = pending.popleft()
+            if deadline_passed():
+                print(f"Build deadline reached - skipping {key}")
+                continue
+            remaining = time_remaining()
+            limit = timeout if remaining is None else min(timeout, remaining + SCRAPER_DEADLINE_GRACE)
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=scrape_in_child, args=(key, horizon_days(), remaining, sender))
+            print(f"Scraping {key} (isolated, {limit:.0f}s limit)...")
+            process.start()
+            sender.close()
+            running[receiver] = (key, process, time.monotonic() + limit)
+
+        for conn in wait_for(list(running), timeout=0.5):
+            key, process, _ = running.pop(conn)
+            try:
+                status, name, payload, lost = conn.recv()
+            except (EOFError, OSError):
+                process.join()
+                print(f"  {key}: worker died (exit code {process.exitcode})")
+                continue
+            process.join()
+            if status == 'ok':
+                print(f"  {name}: found {len(payload)} screenings")
+                yield name, payload, lost
+            else:
+                print(f"  Error scraping {key}: {payload}")
+
+        for conn, (key, process, kill_at) in list(running.items()):
+            rss = tree_rss_mb(process.pid)
+            if time.monotonic() > kill_at:
+                reason = 'time limit'
+            elif rss is not None and rss > max_rss_mb:
+                reason = f'memory limit ({rss:.0f} MB)'
+            else:
+                continue
+            kill_tree(process)
+            del running[conn]
+            conn.close()
+            print(f"  {key}: killed after exceeding its {reason}")
+
+
+def load_upcoming(path):
+    """Load the titles recorded by save_upcoming(): {title|year: {title, year, director, date}}."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_upcoming(movies, path):
+    """Record titles showing after the horizon, for the Letterboxd prefetch.
+
+    Entries from earlier builds are kept until their date comes into the
+    window, so theaters that weren't scraped this time still contribute.
+    """
+    end = horizon_end().strftime('%Y-%m-%d')
+    upcoming = {key: entry for key, entry in load_upcoming(path).items() if entry['date'] >= end}
+
+    for movie in movies:
+        date = movie.get('date') or ''
+        if date < end:
+            continue
+        key = f"{movie['title']}|{movie.get('year') or ''}"
+        entry = upcoming.setdefault(key, {'title': movie['title'], 'year': movie.get('year'),
+                                          'director': movie.get('director'), 'date': date})
+        entry['date'] = min(entry['date'], date)
+        entry['director'] = entry['director'] or movie.get('director')
+
+    write_json_atomic(path, upcoming, separators=(',', ':'))
+    print(f"Recorded {len(upcoming)} upcoming titles for prefetch")
 
 
-def save_data(movies, output_path):
-    """Save movies to JSON file."""
+def load_data(input_path):
+    """Load movies from a previously saved JSON file, in the flat per-screening shape."""
+    try:
+        with open(input_path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if data.get('version', 1) >= 2:
+        return rehydrate_movies(data)
+    return data.get('movies', [])
+
+
+def normalize_movies(movies):
+    """Split screenings into theaters, films and screening rows that reference them by index.
+
+    A film is a distinct (title, year, director, Letterboxd info), so its
+    metadata is stored once however many days and theaters show it. Each
+    screening is a SCREENING_FIELDS list; keys outside the schema ride along
+    in an optional trailing dict.
+    """
+    theaters, films = {}, {}
+    # Enrichment shares one info dict between a film's screenings, so serialize each once
+    letterboxd_keys = {}
+    rows = []
+    for movie in movies:
+        theater = (movie.get('theater'), movie.get('theater_url'), movie.get('address'))
+        theater_id = theaters.setdefault(theater, len(theaters))
+
+        letterboxd = movie.get('letterboxd')
+        letterboxd_key = None
+        if letterboxd:
+            letterboxd_key = letterboxd_keys.get(id(letterboxd))
+            if letterboxd_key is None:
+                letterboxd_key = letterboxd_keys[id(letterboxd)] = json.dumps(letterboxd, sort_keys=True)
+        film = (movie.get('title'), movie.get('year'), movie.get('director'), letterboxd_key)
+        if film not in films:
+            films[film] = (len(films), letterboxd)
+        film_id = films[film][0]
+
+        row = [film_id, theater_id, movie.get('date'), movie.get('times'),
+               movie.get('format'), movie.get('ticket_url')]
+        extra = {k: v for k, v in movie.items() if k not in MOVIE_KEYS}
+        if extra:
+            row.append(extra)
+        rows.append(row)
+
+    film_list = []
+    for (title, year, director, _), (_, letterboxd) in films.items():
+        film = {'title': title, 'year': year, 'director': director}
+        if letterboxd:
+            film['letterboxd'] = letterboxd
+        film_list.append(film)
+
+    return {
+        'theaters': [{'name': n, 'url': u, 'address': a} for n, u, a in theaters],
+        'films': film_list,
+        'fields': SCREENING_FIELDS,
+        'screenings': rows,
+    }
+
+
+def rehydrate_movies(data):
+    """Rebuild the flat screening dicts from a normalized (version 2) data file."""
+    theaters = data['theaters']
+    films = data['films']
+    movies = []
+    for row in data['screenings']:
+        film = films[row[0]]
+        theater = theaters[row[1]]
+        movie = {
+            'title': film['title'],
+            'theater': theater['name'],
+            'theater_url': theater['url'],
+            'address': theater['address'],
+            'date': row[2],
+            'times': row[3],
+            'format': row[4],
+            'director': film['director'],
+            'year': film['year'],
+            'ticket_url': row[5],
+        }
+        if 'letterboxd' in film:
+            movie['letterboxd'] = film['letterboxd']
+        if len(row) > len(SCREENING_FIELDS):
+            movie.update(row[len(SCREENING_FIELDS)])
+        movies.append(movie)
+    return movies
+
+
+def merge_with_previous(movies, scraped_theaters, previous):
+    """Keep previously saved screenings for theaters that weren't fully re-scraped.
+
+    Screenings a partial scrape did return replace their saved versions.
+    """
+    fresh = {screening_id(m) for m in movies}
+    kept = [m for m in previous if m.get('theater') not in scraped_theaters and screening_id(m) not in fresh]
+    kept = filter_to_week(kept)
+    if kept:
+        print(f"Kept {len(kept)} screenings from last build")
+    return kept + movies
+
+
+def save_data(movies, output_path, cursor=None):
+    """Save movies to a compact, normalized JSON file (see normalize_movies).
+
+    `cursor` is the changes feed's {'epoch', 'seq'} after this build,
+    stored alongside so the snapshot lines up with the feed.
+    """
     data = {
+        'version': DATA_VERSION,
         'last_updated': datetime.now().isoformat(),
         'week_of': datetime.now().strftime('%Y-%m-%d'),
-        'movies': movies
+        **(cursor or {}),
+        **normalize_movies(movies),
     }
 
-    with open(output_path, 'w') as f:
-        json.dump(data, f, indent=2)
+    write_json_atomic(output_path, data, separators=(',', ':'), ensure_ascii=False)
 
     print(f"Saved {len(movies)} screenings to {output_path}")
 
 
+def screening_id(movie):
+    """Stable ID for a screening: film, theater, date and format, but not the times."""
+    key = '|'.join(str(movie.get(k) or '') for k in ('title', 'year', 'theater', 'date', 'format'))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+
+def index_screenings(movies):
+    """Map screening_id -> compact screening, merging the times of rows that share an ID."""
+    by_id = {}
+    for movie in movies:
+        sid = screening_id(movie)
+        times = list(movie.get('times') or [])
+        if sid in by_id:
+            by_id[sid]['times'] = list(dict.fromkeys(by_id[sid]['times'] + times))
+            continue
+        by_id[sid] = {'id': sid,
+                      **{k: movie[k] for k in ('title', 'year', 'theater', 'date', 'format', 'ticket_url')
+                         if movie.get(k)},
+                      'times': list(dict.fromkeys(times))}
+    return by_id
+
+
+def diff_screenings(previous, movies):
+    """Compare two builds' screenings. Returns {'added', 'removed', 'retimed'} lists.
+
+    Added entries carry the whole screening; removed ones just enough to
+    name it; retimed ones the new times and what they `was`.
+    """
+    old, new = index_screenings(previous), index_screenings(movies)
+
+    def order(screening):
+        return screening['date'], screening['theater'], screening['title']
+
+    added = sorted((new[sid] for sid in new.keys() - old.keys()), key=order)
+    removed = sorted(({k: old[sid][k] for k in ('id', 'title', 'theater', 'date')}
+                      for sid in old.keys() - new.keys()), key=order)
+    retimed = sorted(({'id': sid, 'title': new[sid]['title'], 'theater': new[sid]['theater'],
+                       'date': new[sid]['date'], 'times': new[sid]['times'], 'was': old[sid]['times']}
+                      for sid in new.keys() & old.keys()
+                      if set(new[sid]['times']) != set(old[sid]['times'])), key=order)
+    return {'added': added, 'removed': removed, 'retimed': retimed}
+
+
+def update_changes_feed(movies, data_dir):
+    """Diff against the last saved movies.json and append the result to the changes feed.
+
+    Only screenings still in the window are compared, so ones that have
+    simply passed aren't reported as removed. A build that changes
+    something gets the next sequence number. A missing feed starts a new
+    `epoch` at seq 0 with nothing recorded, since consumers share no
+    baseline with it. Call before save_data(); returns the feed's
+    {'epoch', 'seq'} cursor for the snapshot.
+    """
+    feed_path = data_dir / CHANGES_NAME
+    try:
+        with open(feed_path) as f:
+            feed = json.load(f)
+    except (OSError, ValueError):
+        feed = None
+
+    data_path = data_dir / 'movies.json'
+    if feed is None or not data_path.exists():
+        feed = {'version': 1, 'epoch': datetime.now().strftime('%Y%m%d%H%M%S'), 'seq': 0, 'changes': []}
+        print(f"Started changes feed epoch {feed['epoch']}")
+    else:
+        feed.setdefault('epoch', datetime.now().strftime('%Y%m%d%H%M%S'))
+        changes = diff_screenings(filter_to_week(load_data(data_path)), movies)
+        counts = {kind: len(items) for kind, items in changes.items()}
+        if any(counts.values()):
+            feed['seq'] += 1
+            change_set = {'seq': feed['seq'], 'built': datetime.now().isoformat(timespec='seconds'), **changes}
+            feed['changes'] = (feed['changes'] + [change_set])[-CHANGES_KEEP:]
+            print(f"Change set {feed['seq']}: {counts['added']} added, {counts['removed']} removed, "
+                  f"{counts['retimed']} retimed")
+        else:
+            print("No schedule changes since the last build")
+
+    write_if_changed(feed_path, json.dumps(feed, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+    return {'epoch': feed['epoch'], 'seq': feed['seq']}
+
+
+def publish_data(data_dir, site_dir):
+    """Copy movies.json and the changes feed into the site for consumers.
+
+    The snapshot carries the feed's epoch and seq, so a consumer resyncing
+    from it knows which change sets to apply next.
+    """
+    for name in ('movies.json', CHANGES_NAME):
+        if (data_dir / name).exists():
+            write_if_changed(site_dir / name, (data_dir / name).read_bytes())
+
+
+def showtime_minutes(time_str):
+    """Parse a showtime like "7:00 pm" or "11:30am" into minutes after midnight (None if unparseable)."""
+    if not time_str:
+        return None
+    match = re.match(r'(\d{1,2}):(\d{2})\s*(am|pm)', time_str.lower().strip())
+    if not match:
+        return None
+
+    hour = int(match.group(1))
+    minute = int(match.group(2))
+    is_pm = match.group(3) == 'pm'
+
+    if is_pm and hour != 12:
+        hour += 12
+    elif not is_pm and hour == 12:
+        hour = 0
+
+    return hour * 60 + minute
+
+
 def time_sort_key(movie):
     """Convert first showtime to sortable value."""
     times = movie.get('times', [])
     if not times or times[0] == 'See website':
         return (2, 0)  # Put "See website" at end
 
-    time_str = times[0].lower().strip()
-    try:
-        # Parse time like "7:00 pm" or "11:30am"
-        import re
-        match = re.match(r'(\d{1,2}):(\d{2})\s*(am|pm)', time_str)
-        if match:
-            hour = int(match.group(1))
-            minute = int(match.group(2))
-            is_pm = match.group(3) == 'pm'
-
-            if is_pm and hour != 12:
-                hour += 12
-            elif not is_pm and hour == 12:
-                hour = 0
-
-            return (0, hour * 60 + minute)
-    except:
-        pass
+    minutes = showtime_minutes(times[0])
+    if minutes is not None:
+        return (0, minutes)
     return (1, 0)  # Unknown times in middle
 
 
@@ -137,87 +660,1023 @@ def group_by_date(movies):
     return {date: sorted(by_date[date], key=time_sort_key) for date in sorted_dates}
 
 
-def generate_html(movies, template_dir, output_path):
-    """Generate static HTML from template."""
-    env = Environment(loader=FileSystemLoader(template_dir))
+def fragment_key(template_source, context):
+    """Hash a fragment's template source together with its inputs."""
+    h = hashlib.sha256(template_source.encode('utf-8'))
+    h.update(json.dumps(context, sort_keys=True, default=str).encode('utf-8'))
+    return h.hexdigest()
+
+
+def load_render_cache(cache_path):
+    """Load rendered fragments from the previous build."""
+    if not cache_path:
+        return {}
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_render_cache(fragments, cache_path):
+    """Save this build's fragments (only those used, so the cache can't grow unbounded)."""
+    if not cache_path:
+        return
+    write_json_atomic(cache_path, fragments)
+
+
+def render_fragment(template, source, context, cache, used):
+    """Render a template fragment, reusing the cached HTML when its inputs are unchanged.
+
+    Returns (key, html). `used` collects every fragment this build touched.
+    """
+    key = fragment_key(source, context)
+    html = cache.get(key)
+    if html is None:
+        html = template.render(**context)
+    used[key] = html
+    return key, html
+
+
+def render_section(env, date, screenings, is_today, slugs, cache, used, root=''):
+    """Render one day section from per-row fragments.
+
+    The section's key is built from its rows' keys, so a day whose screenings
+    didn't change is reused without touching its rows' templates at all.
+    `slugs` is the build's film_slugs(), for the links to film pages.
+    """
+    row_template = env.get_template('_screening.html')
+    row_source = env.loader.get_source(env, '_screening.html')[0]
+    section_source = env.loader.get_source(env, '_day_section.html')[0]
+
+    rows = [render_fragment(row_template, row_source,
+                            {'movie': m, 'doc': search_doc_id(m),
+                             'film_href': f'{root}{FILMS_DIR}/{slugs[film_key(m)]}.html'}, cache, used)
+            for m in screenings]
+    key = fragment_key(section_source, {'date': date, 'is_today': is_today,
+                                        'rows': [k for k, _ in rows]})
+    html = cache.get(key)
+    if html is None:
+        html = env.get_template('_day_section.html').render(
+            date=date, is_today=is_today, rows=[h for _, h in rows]
+        )
+    used[key] = html
+    return html
+
+
+def film_title_key(title):
+    """A title folded for telling films apart: its search words, else (e.g. 東京物語) the NFKC title."""
+    return ' '.join(search_words(title)) or ' '.join(unicodedata.normalize('NFKC', title or '').casefold().split())
+
+
+def film_key(movie):
+    """Identity of a screening's film: its Letterboxd slug, else its folded title and year."""
+    match = re.search(r'/film/([^/]+)', (movie.get('letterboxd') or {}).get('letterboxd_url') or '')
+    if match:
+        return f"letterboxd:{match.group(1)}"
+    return f"title:{film_title_key(movie.get('title'))}|{movie.get('year') or ''}"
+
+
+def short_slug(slug, key):
+    """Cut a slug to FILM_SLUG_MAX, ending it with a hash of `key` so cut slugs stay distinct."""
+    if len(slug.encode('utf-8')) <= FILM_SLUG_MAX:
+        return slug
+    head = slug.encode('utf-8')[:FILM_SLUG_MAX - 7].decode('utf-8', 'ignore').rstrip('-')
+    return f"{head}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:6]}"
+
+
+def film_slug(movie):
+    """File name for a film's detail page: its Letterboxd slug, else its folded title and year.
+
+    Capped at FILM_SLUG_MAX; film_slugs() also resolves clashes between films.
+    """
+    key = film_key(movie)
+    if key.startswith('letterboxd:'):
+        slug = key[len('letterboxd:'):]
+    else:
+        words = search_words(movie.get('title'))
+        if words:
+            slug = '-'.join(words)
+        else:
+            # No Latin letters or digits to spell it with; name it after the title instead
+            title = film_title_key(movie.get('title'))
+            slug = f"film-{hashlib.sha1(title.encode('utf-8')).hexdigest()[:8]}" if title else 'untitled'
+        slug = f"{slug}-{movie['year']}" if movie.get('year') else slug
+    return short_slug(slug, key)
+
+
+def film_slugs(movies):
+    """Return {film_key: page slug} for a build, with no two films sharing a slug.
+
+    Letterboxd films claim their slug first, so a title-derived slug that
+    happens to match one (e.g. "dune-2021") gets a hash of its key appended.
+    """
+    keys = {film_key(m): m for m in movies}
+    slugs = {}
+    taken = set()
+    for key in sorted(keys, key=lambda k: (not k.startswith('letterboxd:'), k)):
+        slug = film_slug(keys[key])
+        if slug in taken:
+            slug = short_slug(f"{slug}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:6]}", key)
+        taken.add(slug)
+        slugs[key] = slug
+    return slugs
+
+
+def film_context(screenings):
+    """Template context for one film's page from all of its screenings."""
+    screenings = sorted(screenings, key=lambda m: (m['date'], time_sort_key(m)))
+    letterboxd = next((m['letterboxd'] for m in screenings if m.get('letterboxd')), None)
+    first = screenings[0]
+    return {
+        'film': {
+            'title': (letterboxd or {}).get('title') or first['title'],
+            'year': next((m['year'] for m in screenings if m.get('year')), None),
+            'director': next((m['director'] for m in screenings if m.get('director')), None)
+                        or (letterboxd or {}).get('director'),
+            'formats': sorted({m['format'] for m in screenings if m.get('format')}),
+            'theaters': sorted({m['theater'] for m in screenings}),
+            'letterboxd': letterboxd,
+        },
+        'screenings': [
+            {key: m.get(key) for key in ('date', 'theater', 'theater_url', 'times', 'format', 'ticket_url')}
+            for m in screenings
+        ],
+    }
+
+
+def generate_film_pages(env, movies, site_dir, root, assets, state_path=None, optimize=False, slugs=None):
+    """Write a page per film under site_dir/films/ with all of its screenings.
+
+    Each page's inputs are hashed (as with fragments) and recorded in
+    state_path; pages whose hash matches the last build are left alone, so
+    a run only renders the films whose screenings or metadata changed.
+    Pages for films no longer showing are removed. `slugs` is the build's
+    film_slugs(), computed here if not given.
+    """
+    slugs = slugs or film_slugs(movies)
+    films_dir = site_dir / FILMS_DIR
+    films_dir.mkdir(exist_ok=True)
+    template = env.get_template('film_template.html')
+    source = env.loader.get_source(env, 'film_template.html')[0]
+
+    by_film = defaultdict(list)
+    for movie in movies:
+        by_film[slugs[film_key(movie)]].append(movie)
+
+    previous = load_render_cache(state_path)
+    state = {}
+    rendered = 0
+    for slug, screenings in by_film.items():
+        context = dict(film_context(screenings), root=f'../{root}', assets=assets, optimize=optimize)
+        state[slug] = fragment_key(source, context)
+        path = films_dir / f'{slug}.html'
+        if previous.get(slug) == state[slug] and path.exists():
+            continue
+        html = template.render(**context)
+        write_if_changed(path, (minify_html(html) if optimize else html).encode('utf-8'))
+        rendered += 1
+
+    for stale in films_dir.glob('*.html'):
+        if stale.stem not in state:
+            stale.unlink()
+
+    save_render_cache(state, state_path)
+    print(f"Rendered {rendered} of {len(state)} film pages ({len(state) - rendered} unchanged)")
+    write_manifest(films_dir)
+
+
+def search_doc_id(movie):
+    """Stable short ID for a film at a theater, used to tie rows to the search index."""
+    key = f"{movie.get('title')}|{movie.get('theater')}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:6]
+
+
+def search_words(text):
+    """Split text into accent-folded lowercase words, the same way the page's search box does.
+
+    Keep in step with `words` in index_template.html: NFKD, drop every
+    combining mark (category M, /\\p{M}/u in JS), lowercase, then runs of a-z0-9.
+    """
+    folded = unicodedata.normalize('NFKD', text or '')
+    folded = ''.join(c for c in folded if not unicodedata.category(c).startswith('M')).lower()
+    return re.findall(r'[a-z0-9]+', folded)
+
+
+def generate_search_index(movies, output_path):
+    """Write the compact search index used by the page's search box.
+
+    Each film-at-a-theater is a document. Every distinct word of its title,
+    director (from the listing or Letterboxd) and theater is stored once in
+    sorted order with the documents it appears in, so the page can find
+    prefix matches with a binary search instead of scanning the DOM:
+
+        {"d": [doc ids], "w": [sorted words], "p": [[doc positions] per word]}
+    """
+    docs = {}
+    postings = defaultdict(set)
+    for movie in movies:
+        doc = search_doc_id(movie)
+        position = docs.setdefault(doc, len(docs))
+        director = movie.get('director') or (movie.get('letterboxd') or {}).get('director')
+        for text in (movie.get('title'), director, movie.get('theater')):
+            for word in search_words(text):
+                postings[word].add(position)
+
+    words = sorted(postings)
+    index = {
+        'd': list(docs),
+        'w': words,
+        'p': [sorted(postings[word]) for word in words],
+    }
+    data = json.dumps(index, separators=(',', ':')).encode('utf-8')
+    write_if_changed(output_path, data)
+
+    print(f"Generated {output_path} ({len(docs)} films, {len(data) / 1024:.1f} KB)")
+
+
+def generate_lite_page(env, movies_by_date, output_path, root='', last_updated=''):
+    """Write the text-only listings: one line per screening, grouped by day.
+
+    The page has inline CSS and no external resources. It must stay under
+    LITE_BUDGET_BYTES gzipped; if a week of screenings doesn't fit, ticket
+    links are dropped first and then days from the end of the week.
+    """
+    template = env.get_template('lite_template.html')
+    days = dict(movies_by_date)
+    links = True
+    while True:
+        html = template.render(days=days, links=links, truncated=len(days) < len(movies_by_date),
+                               root=root, last_updated=last_updated)
+        size = len(gzip.compress(html.encode('utf-8'), 9, mtime=0))
+        if size <= LITE_BUDGET_BYTES or not days:
+            break
+        if links:
+            links = False
+        else:
+            days.popitem()
+
+    if not links:
+        print(f"  {output_path.name} over {LITE_BUDGET_BYTES / 1024:.0f} KB gzipped: dropped ticket links"
+              f" and showing {len(days)} of {len(movies_by_date)} days")
+    write_if_changed(output_path, html.encode('utf-8'))
+    print(f"Generated {output_path} ({size / 1024:.1f} KB gzipped)")
+
+
+def page_number(date_str, today):
+    """Which output page a date belongs on (0 is index.html)."""
+    offset = (datetime.strptime(date_str, '%Y-%m-%d').date() - today).days
+    return max(0, offset // PAGE_DAYS)
+
+
+def page_filename(number):
+    """Output file name for a page number."""
+    return 'index.html' if number == 0 else f'week-{number + 1}.html'
+
+
+def paginate(movies_by_date, today):
+    """Split grouped movies into pages: {page number: {date: screenings}}."""
+    pages = defaultdict(dict)
+    for date, screenings in movies_by_date.items():
+        pages[page_number(date, today)][date] = screenings
+    return dict(sorted(pages.items()))
+
+
+def page_label(dates):
+    """Nav label for a page, e.g. 'Oct 27 - Nov 2'."""
+    first = datetime.strptime(dates[0], '%Y-%m-%d')
+    last = datetime.strptime(dates[-1], '%Y-%m-%d')
+    return f"{first.strftime('%b %-d')} - {last.strftime('%b %-d')}"
+
+
+def content_hash(data):
+    """SHA-256 hex digest of some bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_if_changed(path, data):
+    """Write bytes to path unless it already holds exactly those bytes. Returns True if written."""
+    path = Path(path)
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def replace_if_changed(tmp_path, path):
+    """Move a freshly written tmp_path over path, or discard it if path is identical. Returns True if replaced."""
+    try:
+        if filecmp.cmp(tmp_path, path, shallow=False):
+            os.unlink(tmp_path)
+            return False
+    except OSError:
+        pass
+    os.replace(tmp_path, path)
+    return True
+
+
+def fingerprint_assets(site_root):
+    """Copy each static asset to a content-hashed name, e.g. styles.<hash>.css.
+
+    Returns {asset: fingerprinted name} for the templates. Fingerprinted
+    copies from earlier builds are removed.
+    """
+    names = {}
+    for asset in FINGERPRINT_ASSETS:
+        source = site_root / asset
+        if not source.exists():
+            names[asset] = asset
+            continue
+        data = source.read_bytes()
+        stem, suffix = os.path.splitext(asset)
+        names[asset] = f'{stem}.{content_hash(data)[:10]}{suffix}'
+        write_if_changed(site_root / names[asset], data)
+
+        pattern = re.compile(rf'{re.escape(stem)}\.[0-9a-f]{{10}}{re.escape(suffix)}(\.gz|\.br)?')
+        for old in site_root.glob(f'{stem}.*'):
+            if pattern.fullmatch(old.name) and not old.name.startswith(names[asset]):
+                old.unlink(missing_ok=True)
+    return names
+
+
+def compressed_siblings(path):
+    """The precompressed copies kept next to an output file."""
+    siblings = [path.with_name(path.name + '.gz')]
+    if brotli is not None:
+        siblings.append(path.with_name(path.name + '.br'))
+    return siblings
+
+
+def precompress(path):
+    """Write .gz (and .br) copies of a file for servers that serve precompressed assets."""
+    data = path.read_bytes()
+    # mtime=0 keeps the gzip bytes identical across builds of identical input
+    write_if_changed(path.with_name(path.name + '.gz'), gzip.compress(data, 9, mtime=0))
+    if brotli is not None:
+        write_if_changed(path.with_name(path.name + '.br'), brotli.compress(data))
+
+
+def write_manifest(site_dir):
+    """Precompress a site directory's outputs and record their hashes in manifest.json.
+
+    Only files whose hash differs from the previous manifest are
+    recompressed. Market subdirectories have their own manifests.
+    Returns the names of files added or changed since the last build.
+    """
+    manifest_path = site_dir / MANIFEST_NAME
+    try:
+        with open(manifest_path) as f:
+            previous = json.load(f).get('files', {})
+    except (OSError, ValueError):
+        previous = {}
+
+    files = {}
+    changed = []
+    for path in sorted(site_dir.iterdir()):
+        if (not path.is_file() or path.name == MANIFEST_NAME or path.name.startswith('.')
+                or path.suffix in ('.gz', '.br')):
+            continue
+        digest = content_hash(path.read_bytes())
+        files[path.name] = digest
+        if previous.get(path.name) != digest:
+            changed.append(path.name)
+        if path.suffix in COMPRESS_SUFFIXES and (
+                previous.get(path.name) != digest or not all(p.exists() for p in compressed_siblings(path))):
+            precompress(path)
+
+    # Compressed copies of files that no longer exist
+    for path in list(site_dir.glob('*.gz')) + list(site_dir.glob('*.br')):
+        if path.name[:-len(path.suffix)] not in files:
+            path.unlink(missing_ok=True)
+
+    write_if_changed(manifest_path, json.dumps({'version': 1, 'files': files}, indent=2, sort_keys=True).encode('utf-8'))
+    removed = len(set(previous) - set(files))
+    print(f"{manifest_path}: {len(changed)} of {len(files)} files changed, {removed} removed")
+    return changed
+
+
+def split_css_rules(css):
+    """Split a stylesheet into top-level (prelude, body) pairs, comments removed."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    rules = []
+    depth = 0
+    start = 0
+    prelude = None
+    for i, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                prelude = css[start:i].strip()
+                start = i + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append((prelude, css[start:i]))
+                start = i + 1
+    return rules
+
+
+def minify_css(css):
+    """Collapse whitespace in a stylesheet fragment."""
+    css = ' '.join(css.split())
+    return re.sub(r'\s*([{}:;,>])\s*', r'\1', css).replace(';}', '}')
+
+
+def critical_css(css):
+    """Return the minified rules of a stylesheet that match CRITICAL_SELECTORS.
+
+    @media blocks are filtered the same way; @keyframes and other at-rules
+    are left to the full stylesheet.
+    """
+    kept = []
+    for prelude, body in split_css_rules(css):
+        if prelude.startswith('@media'):
+            inner = critical_css(body)
+            if inner:
+                kept.append(f'{prelude}{{{inner}}}')
+        elif not prelude.startswith('@'):
+            selectors = [sel.strip() for sel in prelude.split(',')]
+            if any(sel.startswith(CRITICAL_SELECTORS) for sel in selectors):
+                kept.append(f'{prelude}{{{body}}}')
+    return minify_css(''.join(kept))
+
+
+def minify_html(html):
+    """Strip comments and collapse whitespace in rendered HTML.
+
+    Runs of whitespace become one space (how the browser renders them
+    anyway) and whitespace next to block-level tags is dropped. Contents of
+    RAW_TEXT_TAGS only lose their indentation.
+    """
+    raw = re.compile(rf'(<({"|".join(RAW_TEXT_TAGS)})\b[^>]*>)(.*?)(</\2>)', re.S | re.I)
+    block = "|".join(BLOCK_TAGS)
+    parts = []
+    position = 0
+    for match in raw.finditer(html):
+        parts.append(html[position:match.start()])
+        body = match.group(3)
+        if match.group(2).lower() in ('script', 'style'):
+            body = '\n'.join(line.strip() for line in body.splitlines() if line.strip())
+        parts.append(('raw', match.group(1) + body + match.group(4)))
+        position = match.end()
+    parts.append(html[position:])
+
+    out = []
+    for part in parts:
+        if isinstance(part, tuple):
+            out.append(part[1])
+            continue
+        text = re.sub(r'<!--(?!\[if).*?-->', '', part, flags=re.S)
+        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(rf'\s*(</?(?:{block})\b[^>]*>)\s*', r'\1', text, flags=re.I)
+        out.append(text)
+
+    html = ''.join(out)
+    # Whitespace between a raw-text element and a neighbouring block tag
+    html = re.sub(rf'(</(?:script|style)>)\s+(?=</?(?:{block})\b)', r'\1', html, flags=re.I)
+    html = re.sub(rf'(?<=>)\s+(<(?:script|style)\b)', r'\1', html, flags=re.I)
+    return html.strip() + '\n'
+
+
+def template_env(template_dir):
+    """Return a Jinja environment for the site templates.
+
+    Compiled templates are kept and recompiled only when their file
+    changes, so a long-lived environment re-renders quickly.
+    """
+    from jinja2 import Environment, FileSystemLoader
+
+    env = Environment(loader=FileSystemLoader(template_dir), auto_reload=True)
     env.filters['format_day'] = format_day
+    return env
+
+
+def page_layout(movies, movies_by_date, now):
+    """Lay screenings (and the same grouped by group_by_date) out into pages.
+
+    Returns (today, tonight's screenings, {page number: {date: screenings}},
+    the page nav, the theater names). Today gets its own section, so it's
+    left out of the pages' day sections.
+    """
+    today = now.strftime('%Y-%m-%d')
+    tonight_movies = [m for m in movies if m['date'] == today]
+    theaters = sorted(set(m['theater'] for m in movies))
+
+    pages = paginate({k: v for k, v in movies_by_date.items() if k != today}, now.date())
+    pages.setdefault(0, {})
+
+    nav = []
+    if len(pages) > 1:
+        nav = [{'label': 'This week' if number == 0 else page_label(list(days)),
+                'href': page_filename(number), 'number': number}
+               for number, days in pages.items()]
+    return today, tonight_movies, pages, nav, theaters
+
+
+def page_context(number, days, nav, theaters, root, assets, inline_css, now):
+    """Template variables for a page, other than its rendered sections."""
+    first_day = datetime.strptime(next(iter(days)), '%Y-%m-%d') if number else now
+    return {
+        'has_day_sections': bool(days),
+        'pages': nav,
+        'current_page': number,
+        'theaters': theaters,
+        'root': root,
+        'assets': assets,
+        'critical_css': inline_css,
+        'week_of': first_day.strftime('%B %-d, %Y'),
+        'last_updated': now.strftime('%B %-d at %-I:%M %p'),
+    }
+
+
+def render_index(movies, env, output_path, root=''):
+    """Render only the first page, straight from the templates.
+
+    For the dev server: no fragment cache, fingerprinted or precompressed
+    assets, week pages, film pages, search index or manifest, so nothing in
+    site/ or data/ is touched. The stylesheet is linked by its plain name.
+    """
+    template = env.get_template('index_template.html')
+    now = datetime.now(CHICAGO_TZ)
+    today, tonight_movies, pages, nav, theaters = page_layout(movies, group_by_date(movies), now)
+    days = pages[0]
 
+    cache, used = {}, {}
+    slugs = film_slugs(movies)
+    today_section = render_section(env, today, tonight_movies, True, slugs, cache, used, root) if tonight_movies else ''
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    template.stream(
+        today_section=today_section,
+        day_sections=(render_section(env, date, screenings, False, slugs, cache, used, root)
+                      for date, screenings in days.items()),
+        **page_context(0, days, nav, theaters, root, {asset: asset for asset in FINGERPRINT_ASSETS}, '', now)
+    ).dump(str(output_path))
+
+
+def generate_html(movies, template_dir, output_path, cache_path=None, root='', optimize=False, env=None):
+    """Generate static HTML from template.
+
+    `root` is the relative path from the output page back to the site root,
+    for pages built into a market subdirectory. With `optimize`, pages are
+    minified, the critical CSS is inlined and the stylesheet and web fonts
+    load without blocking first paint.
+
+    Day sections and screening rows are rendered as fragments; with a
+    cache_path, fragments whose inputs match the last build are reused.
+    Days beyond the first week go to week-N.html pages next to output_path,
+    and each page is streamed to disk section by section. Pages are only
+    replaced when their bytes change; afterwards the output directory gets
+    precompressed copies and a manifest (see write_manifest). A text-only
+    version of the first week goes to lite.html (see generate_lite_page).
+    Pass `env` (from template_env) to reuse compiled templates between renders.
+    """
+    env = env or template_env(template_dir)
     template = env.get_template('index_template.html')
 
     movies_by_date = group_by_date(movies)
+    now = datetime.now(CHICAGO_TZ)
+    today, tonight_movies, pages, nav, theaters = page_layout(movies, movies_by_date, now)
 
-    # Get unique theaters
-    theaters = sorted(set(m['theater'] for m in movies))
+    output_path = Path(output_path)
+    site_root = (output_path.parent / root).resolve()
+    assets = fingerprint_assets(site_root)
+    inline_css = critical_css((site_root / 'styles.css').read_text()) if optimize else ''
 
-    # Get tonight's movies
-    today = datetime.now(CHICAGO_TZ).strftime('%Y-%m-%d')
-    tonight_movies = [m for m in movies if m['date'] == today]
+    slugs = film_slugs(movies)
+    cache = load_render_cache(cache_path)
+    used = {}
 
-    # Exclude today from movies_by_date since it's in the Today section
-    movies_by_date_excluding_today = {k: v for k, v in movies_by_date.items() if k != today}
+    for number, days in pages.items():
+        today_section = ''
+        if number == 0 and tonight_movies:
+            today_section = render_section(env, today, tonight_movies, True, slugs, cache, used, root)
+        day_sections = (render_section(env, date, screenings, False, slugs, cache, used, root)
+                        for date, screenings in days.items())
 
-    html = template.render(
-        movies_by_date=movies_by_date_excluding_today,
-        theaters=theaters,
-        tonight_movies=tonight_movies,
-        week_of=datetime.now(CHICAGO_TZ).strftime('%B %-d, %Y'),
-        last_updated=datetime.now(CHICAGO_TZ).strftime('%B %-d at %-I:%M %p')
-    )
+        page_path = output_path if number == 0 else output_path.parent / page_filename(number)
+        tmp_path = page_path.with_name(f'.{page_path.name}.{os.getpid()}.tmp')
+        template.stream(
+            today_section=today_section,
+            day_sections=day_sections,
+            **page_context(number, days, nav, theaters, root, assets, inline_css, now)
+        ).dump(str(tmp_path))
+        if optimize:
+            tmp_path.write_text(minify_html(tmp_path.read_text()))
 
-    with open(output_path, 'w') as f:
-        f.write(html)
+        if replace_if_changed(tmp_path, page_path):
+            print(f"Generated {page_path}")
+        else:
+            print(f"Unchanged {page_path}")
 
-    print(f"Generated {output_path}")
+    # Drop week pages left over from a longer horizon
+    for stale in output_path.parent.glob('week-*.html'):
+        if stale.name not in {page_filename(n) for n in pages}:
+            stale.unlink()
 
+    reused = sum(1 for key in used if key in cache)
+    print(f"Rendered {len(used) - reused} of {len(used)} fragments ({reused} reused)")
+    save_render_cache(used, cache_path)
 
-def main():
-    """Main build process."""
-    base_dir = Path(__file__).parent
-    data_dir = base_dir / 'data'
-    site_dir = base_dir / 'site'
-    template_dir = base_dir / 'templates'
+    week = {date: screenings for date, screenings in movies_by_date.items()
+            if page_number(date, now.date()) == 0}
+    generate_lite_page(env, week, output_path.parent / LITE_PAGE, root, now.strftime('%B %-d at %-I:%M %p'))
+
+    film_state_path = Path(cache_path).with_name('film_pages.json') if cache_path else None
+    generate_film_pages(env, movies, output_path.parent, root, assets, film_state_path, optimize, slugs)
+
+    generate_search_index(movies, output_path.parent / 'search-index.json')
+    write_manifest(output_path.parent)
+
+
+def market_dirs(market):
+    """Return (data_dir, site_dir) for a market.
+
+    The default market keeps the original data/ and site/ locations; other
+    markets get their own subdirectory in each.
+    """
+    if market == DEFAULT_MARKET:
+        return BASE_DIR / 'data', BASE_DIR / 'site'
+    return BASE_DIR / 'data' / market, BASE_DIR / 'site' / market
+
+
+def sample_movies():
+    """Placeholder schedule used when no scraper returns anything."""
+    return [
+        {
+            'title': 'Sample Film',
+            'theater': 'Music Box Theatre',
+            'theater_url': 'https://musicboxtheatre.com',
+            'address': '3733 N Southport Ave',
+            'date': datetime.now().strftime('%Y-%m-%d'),
+            'times': ['7:00 PM'],
+            'format': '35mm',
+            'director': 'Test Director',
+            'year': 2024,
+            'ticket_url': 'https://musicboxtheatre.com'
+        }
+    ]
 
-    # Ensure directories exist
-    data_dir.mkdir(exist_ok=True)
-    site_dir.mkdir(exist_ok=True)
 
-    print("=" * 50)
-    print("Third Coast Cinema - Build")
-    print("=" * 50)
-    print()
+def build_market(market, args, deadline=None):
+    """Scrape, enrich, save and render one market.
+
+    Runs in-process for single-market builds and as a process-pool shard
+    otherwise. `deadline` is a time.time() timestamp shared by all shards.
+    Returns a summary dict for merge_shards().
+    """
+    set_horizon(args.days)
+    if deadline:
+        set_deadline(max(0.001, deadline - time.time()))
+
+    data_dir, site_dir = market_dirs(market)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    site_dir.mkdir(parents=True, exist_ok=True)
+    root = '' if market == DEFAULT_MARKET else '../'
+
+    if args.render_only:
+        movies = filter_to_week(load_data(data_dir / 'movies.json'))
+        generate_html(movies, TEMPLATE_DIR, site_dir / 'index.html', data_dir / 'render_cache.json', root,
+                      args.optimize)
+        return {'market': market, 'screenings': len(movies), 'data_dir': str(data_dir)}
+
+    # Letterboxd lookups run alongside the scrapers, starting as each one finishes
+    pipeline = None
+    if not args.no_enrich:
+        from scrapers.letterboxd import EnrichmentPipeline
+        pipeline = EnrichmentPipeline()
 
     # Run scrapers
-    movies = run_scrapers()
+    movies, scraped_theaters = run_scrapers(select_scrapers(args.only, args.skip, market),
+                                            data_dir / 'upcoming.json', args.isolate, args.jobs,
+                                            pipeline.submit if pipeline else None)
+
+    # Collect the Letterboxd data (only the freshly scraped rows need it)
+    if pipeline:
+        print("\nFinishing Letterboxd lookups...")
+        movies = pipeline.finish(movies)
 
-    if not movies:
+    # Theaters that were skipped, failed or ran out of time keep their last saved screenings
+    movies = merge_with_previous(movies, scraped_theaters, load_data(data_dir / 'movies.json'))
+
+    if not movies and market == DEFAULT_MARKET:
+        # Rendered only: saving it would put a fake screening in the data and the changes feed
         print("\nNo movies found. Using sample data for testing.")
-        movies = [
-            {
-                'title': 'Sample Film',
-                'theater': 'Music Box Theatre',
-                'theater_url': 'https://musicboxtheatre.com',
-                'address': '3733 N Southport Ave',
-                'date': datetime.now().strftime('%Y-%m-%d'),
-                'times': ['7:00 PM'],
-                'format': '35mm',
-                'director': 'Test Director',
-                'year': 2024,
-                'ticket_url': 'https://musicboxtheatre.com'
-            }
-        ]
-
-    # Enrich with Letterboxd data
-    print("\nFetching Letterboxd data...")
-    movies = enrich_movies_with_letterboxd(movies)
-
-    # Save data
-    save_data(movies, data_dir / 'movies.json')
+        movies = sample_movies()
+    else:
+        # Save data, recording what changed since the last build
+        cursor = update_changes_feed(movies, data_dir)
+        save_data(movies, data_dir / 'movies.json', cursor)
+        publish_data(data_dir, site_dir)
 
     # Generate HTML
-    generate_html(movies, template_dir, site_dir / 'index.html')
+    generate_html(movies, TEMPLATE_DIR, site_dir / 'index.html', data_dir / 'render_cache.json', root,
+                      args.optimize)
+
+    return {'market': market, 'screenings': len(movies), 'data_dir': str(data_dir)}
+
+
+def build_shard(market, args, deadline=None):
+    """build_market() in a pool worker.
+
+    The Letterboxd cache and film catalog are shared files, so the shard
+    keeps its new entries in memory and returns them in the summary (as
+    'lookups') for the parent to merge and write. The shard's parse pool is
+    shut down before returning.
+    """
+    try:
+        if args.no_enrich or args.render_only:
+            return build_market(market, args, deadline)
+
+        from scrapers import letterboxd
+        letterboxd.hold_writes()
+        summary = build_market(market, args, deadline)
+        summary['lookups'] = letterboxd.take_new_entries()
+        return summary
+    finally:
+        # Pool workers exit without running atexit hooks, which would stop it
+        shutdown_parse_pool()
+
+
+def run_shards(markets, args, jobs, deadline=None, retries=SHARD_RETRIES):
+    """Build markets as shards in a process pool.
+
+    Shards wait in a local queue; a shard that raises (or whose worker dies)
+    goes back on the queue until it has been retried `retries` times. A dead
+    worker breaks the pool, so a fresh pool is started for what's left.
+    Returns {market: summary} for the shards that succeeded.
+    """
+    queue = deque(markets)
+    attempts = defaultdict(int)
+    results = {}
+
+    def shard_failed(market, error):
+        if attempts[market] <= retries:
+            print(f"[{market}] failed ({error}) - retrying")
+            queue.append(market)
+        else:
+            print(f"[{market}] failed ({error}) - giving up after {attempts[market]} attempts")
+
+    while queue:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            pending = {}
+            broken = False
+            while (queue and not broken) or pending:
+                while queue and not broken and len(pending) < jobs:
+                    market = queue.popleft()
+                    attempts[market] += 1
+                    pending[pool.submit(build_shard, market, args, deadline)] = market
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    market = pending.pop(future)
+                    try:
+                        results[market] = future.result()
+                        print(f"[{market}] done: {results[market]['screenings']} screenings")
+                        lookups = results[market].pop('lookups', None)
+                        if lookups:
+                            from scrapers.letterboxd import merge_new_entries
+                            merge_new_entries(lookups)
+                    except BrokenProcessPool as e:
+                        broken = True
+                        shard_failed(market, e)
+                    except Exception as e:
+                        shard_failed(market, e)
+
+    return results
+
+
+def merge_shards(results, output_path):
+    """Combine each market's saved screenings into one index, tagged by market."""
+    markets = {}
+    movies = []
+    for market in sorted(results):
+        data_dir = Path(results[market]['data_dir'])
+        market_movies = load_data(data_dir / 'movies.json')
+        for movie in market_movies:
+            movie['market'] = market
+        movies.extend(market_movies)
+        markets[market] = {
+            'screenings': len(market_movies),
+            'data': str((data_dir / 'movies.json').relative_to(BASE_DIR)),
+            'site': str((market_dirs(market)[1] / 'index.html').relative_to(BASE_DIR)),
+        }
+
+    data = {
+        'last_updated': datetime.now().isoformat(),
+        'markets': markets,
+        'movies': movies
+    }
+    write_json_atomic(output_path, data)
+
+    print(f"Merged {len(movies)} screenings from {len(markets)} markets into {output_path}")
+
+
+def run_prefetch(markets, args):
+    """Warm the Letterboxd cache with the titles recorded beyond the horizon.
+
+    Meant for an off-peak run; the process lowers its own priority and
+    spaces out requests.
+    """
+    from scrapers.letterboxd import prefetch_letterboxd
+
+    if hasattr(os, 'nice'):
+        os.nice(PREFETCH_NICENESS)
+    if args.time_budget:
+        set_deadline(args.time_budget)
+
+    titles = {}
+    for market in markets:
+        data_dir, _ = market_dirs(market)
+        titles.update(load_upcoming(data_dir / 'upcoming.json'))
+
+    # Soonest first, so a cut-short run still covers next week's new titles
+    entries = sorted(titles.values(), key=lambda e: e['date'])
+    fetched = prefetch_letterboxd([(e['title'], e['year'], e['director']) for e in entries])
+    print(f"Prefetched Letterboxd data for {fetched} of {len(entries)} upcoming titles")
+
+
+def refresh_theater(key, args, by_theater, upcoming_path=None):
+    """Re-scrape one theater into by_theater ({theater name: screenings}).
+
+    Titles beyond the horizon are recorded in upcoming_path, as in a full
+    build. Returns True if any of its screenings changed.
+    """
+    movies, scraped_theaters = run_scrapers([key], upcoming_path, isolate=args.isolate)
+    if not args.no_enrich and movies:
+        from scrapers.letterboxd import enrich_movies_with_letterboxd
+        movies = enrich_movies_with_letterboxd(movies)
+
+    changed = False
+    for theater in scraped_theaters:
+        rows = [m for m in movies if m['theater'] == theater]
+        if rows != by_theater.get(theater):
+            by_theater[theater] = rows
+            changed = True
+    return changed
+
+
+def run_daemon(args, markets=(DEFAULT_MARKET,)):
+    """Keep running, refreshing each theater in `markets` on its own cadence.
+
+    The HTTP sessions, the Letterboxd cache and (for Siskel) the headless
+    browser stay warm between refreshes. With --isolate each refresh runs in
+    a fresh process, so the browser is started per refresh instead. The
+    page is re-rendered only when a theater's screenings change or the day
+    rolls over, and the fragment cache limits that to the day sections that
+    actually differ. Each market is saved and rendered into its own
+    directories, as build_market() does.
+    """
+    from scrapers import browser
+    from scrapers.utils import reset_circuits
+
+    by_theater = {}
+    market_of = {}
+    for market in markets:
+        data_dir, site_dir = market_dirs(market)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        site_dir.mkdir(parents=True, exist_ok=True)
+        by_theater[market] = defaultdict(list)
+        for movie in filter_to_week(load_data(data_dir / 'movies.json')):
+            by_theater[market][movie['theater']].append(movie)
+        for key in select_scrapers(args.only, args.skip, market):
+            market_of[key] = market
+
+    keys = list(market_of)
+    next_due = {key: 0 for key in keys}
+    rendered_days = {}
+    # Isolated scrapers run in throwaway processes, so there is no browser here to keep
+    if not args.isolate:
+        browser.keep_warm()
+
+    try:
+        while True:
+            now = time.time()
+            due = [key for key in keys if next_due[key] <= now]
+            changed = set()
+
+            if due:
+                # Each refresh pass gets a fresh budget and closed breakers
+                set_deadline(args.time_budget)
+                reset_circuits()
+                for key in due:
+                    market = market_of[key]
+                    if refresh_theater(key, args, by_theater[market], market_dirs(market)[0] / 'upcoming.json'):
+                        changed.add(market)
+                    next_due[key] = time.time() + REFRESH_INTERVALS.get(key, DEFAULT_REFRESH_INTERVAL)
+
+            today = datetime.now(CHICAGO_TZ).strftime('%Y-%m-%d')
+            for market in markets:
+                if market not in changed and rendered_days.get(market) == today:
+                    continue
+                data_dir, site_dir = market_dirs(market)
+                root = '' if market == DEFAULT_MARKET else '../'
+                movies = filter_to_week([m for rows in by_theater[market].values() for m in rows])
+                cursor = update_changes_feed(movies, data_dir)
+                save_data(movies, data_dir / 'movies.json', cursor)
+                publish_data(data_dir, site_dir)
+                generate_html(movies, TEMPLATE_DIR, site_dir / 'index.html', data_dir / 'render_cache.json', root,
+                              args.optimize)
+                rendered_days[market] = today
+
+            # Sleep until the next theater is due or midnight, whichever is first
+            tomorrow = datetime.now(CHICAGO_TZ).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+            wake = min(min(next_due.values(), default=now + DEFAULT_REFRESH_INTERVAL), tomorrow.timestamp())
+            time.sleep(max(1, wake - time.time()))
+    except KeyboardInterrupt:
+        print("\nStopping daemon")
+    finally:
+        browser.close_browser()
+        shutdown_parse_pool()
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Build the Third Coast Cinema site.')
+    parser.add_argument('--only', nargs='+', choices=SCRAPER_KEYS, metavar='THEATER',
+                        help='only scrape these theaters; others come from the last build '
+                             f'(choices: {", ".join(SCRAPER_KEYS)})')
+    parser.add_argument('--skip', nargs='+', choices=SCRAPER_KEYS, metavar='THEATER',
+                        help='skip these theaters and reuse their data from the last build')
+    parser.add_argument('--no-enrich', action='store_true',
+                        help='skip Letterboxd lookups')
+    parser.add_argument('--days', type=int, default=HORIZON_DAYS, metavar='N',
+                        help='schedule horizon: scrape and show N days starting today (at least 1) '
+                             f'(default: {HORIZON_DAYS}); days past the first week go on week-N.html pages')
+    parser.add_argument('--time-budget', type=float, default=DEFAULT_TIME_BUDGET, metavar='SECONDS',
+                        help='overall deadline for scraping and enrichment; stages stop '
+                             f'making requests once it passes (default: {DEFAULT_TIME_BUDGET}, 0 disables)')
+    parser.add_argument('--render-only', action='store_true',
+                        help='re-render site/index.html from data/movies.json without scraping')
+    parser.add_argument('--markets', nargs='+', choices=MARKET_KEYS + ['all'], default=[DEFAULT_MARKET],
+                        metavar='MARKET',
+                        help=f'markets to build (choices: {", ".join(MARKET_KEYS)}, or all; '
+                             f'default: {DEFAULT_MARKET})')
+    parser.add_argument('--daemon', action='store_true',
+                        help='keep running and refresh each theater on its own cadence')
+    parser.add_argument('--isolate', action='store_true',
+                        help='run each scraper in its own process, killing any that hang or use too much '
+                             f'memory ({SCRAPER_TIMEOUT}s / {SCRAPER_MAX_RSS_MB} MB; up to --jobs at once); '
+                             'with --daemon the browser is no longer kept warm between refreshes')
+    parser.add_argument('--prefetch', action='store_true',
+                        help='warm the Letterboxd cache for titles seen beyond the horizon '
+                             '(run off-peak; no scraping or rendering)')
+    parser.add_argument('--optimize', action='store_true',
+                        help='minify pages, inline critical CSS and load the stylesheet and fonts without blocking')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, metavar='N',
+                        help='worker processes for multi-market builds (default: CPU count)')
+    args = parser.parse_args(argv)
+    if args.days < 1:
+        parser.error('--days must be at least 1')
+    return args
+
+
+def main(argv=None):
+    """Main build process."""
+    args = parse_args(argv)
+    set_horizon(args.days)
+
+    try:
+        markets = MARKET_KEYS if 'all' in args.markets else list(dict.fromkeys(args.markets))
+
+        if args.daemon:
+            run_daemon(args, markets)
+            return
+
+        if args.prefetch:
+            run_prefetch(markets, args)
+            return
+
+        if args.render_only:
+            for market in markets:
+                build_market(market, args)
+            return
+
+        print("=" * 50)
+        print("Third Coast Cinema - Build")
+        print("=" * 50)
+        print()
+
+        deadline = time.time() + args.time_budget if args.time_budget else None
+
+        if len(markets) == 1:
+            build_market(markets[0], args, deadline)
+        else:
+            jobs = max(1, min(args.jobs, len(markets)))
+            print(f"Building {len(markets)} markets with {jobs} workers")
+            results = run_shards(markets, args, jobs, deadline)
+            merge_shards(results, BASE_DIR / 'data' / 'markets.json')
 
-    print()
-    print("Build complete!")
+        print()
+        print("Build complete!")
+    finally:
+        # Its workers would otherwise outlive the build
+        shutdown_parse_pool()
 
 
 if __name__ == '__main__':
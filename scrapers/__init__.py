@@ -1,13 +1,34 @@
-from .doc_films import scrape_doc_films
-from .music_box import scrape_music_box
-from .logan import scrape_logan
-from .facets import scrape_facets
-from .siskel import scrape_siskel
-from .alamo import scrape_alamo
-from .davis import scrape_davis
-from .utils import get_week_dates
+"""Theater scrapers.
+
+Each theater lives in its own module named after its key (e.g. ``logan.py``)
+and defines ``THEATER_INFO`` plus a ``scrape_<key>()`` function. A module is
+a scraper exactly when it assigns ``THEATER_INFO`` at the top level; that is
+checked in its source, so modules are only imported when their scraper is
+used and startup doesn't pay for bs4/lxml/requests until a scrape runs.
+"""
+import importlib
+import pkgutil
+import re
+from pathlib import Path
+
+# Marks a theater scraper module (helpers like utils.py don't define it)
+SCRAPER_MARKER = re.compile(r'^THEATER_INFO\s*=', re.MULTILINE)
+
+# Run order for the known theaters; anything else discovered runs after these
+SCRAPER_ORDER = ['siskel', 'doc_films', 'music_box', 'logan', 'facets', 'alamo', 'davis']
+
+# Market -> theater keys. Discovered scrapers not listed under any market
+# belong to DEFAULT_MARKET, so new Chicago theaters need no entry here.
+DEFAULT_MARKET = 'chicago'
+MARKETS = {
+    DEFAULT_MARKET: SCRAPER_ORDER,
+}
 
 __all__ = [
+    'available_scrapers',
+    'available_markets',
+    'market_scrapers',
+    'load_scraper',
     'scrape_doc_films',
     'scrape_music_box',
     'scrape_logan',
@@ -17,3 +38,55 @@ __all__ = [
     'scrape_davis',
     'get_week_dates'
 ]
+
+
+def is_scraper_module(path):
+    """Whether the module at `path` assigns THEATER_INFO, read without importing it."""
+    try:
+        return bool(SCRAPER_MARKER.search(Path(path).read_text(encoding='utf-8')))
+    except (OSError, UnicodeDecodeError):
+        return False
+
+
+def available_scrapers():
+    """Return the keys of all theater scraper modules, in run order."""
+    keys = [
+        info.name for info in pkgutil.iter_modules(__path__)
+        if not info.ispkg and not info.name.startswith('_')
+        and is_scraper_module(Path(info.module_finder.path) / f'{info.name}.py')
+    ]
+    known = [key for key in SCRAPER_ORDER if key in keys]
+    return known + sorted(key for key in keys if key not in SCRAPER_ORDER)
+
+
+def available_markets():
+    """Return the configured market names, default market first."""
+    return [DEFAULT_MARKET] + sorted(m for m in MARKETS if m != DEFAULT_MARKET)
+
+
+def market_scrapers(market):
+    """Return the scraper keys for a market, in run order."""
+    keys = available_scrapers()
+    if market == DEFAULT_MARKET:
+        claimed = {k for m, ks in MARKETS.items() if m != DEFAULT_MARKET for k in ks}
+        return [k for k in keys if k not in claimed]
+    listed = MARKETS.get(market, [])
+    return [k for k in keys if k in listed]
+
+
+def load_scraper(key):
+    """Import a theater's module and return (scrape function, THEATER_INFO)."""
+    module = importlib.import_module(f'.{key}', __name__)
+    return getattr(module, f'scrape_{key}'), module.THEATER_INFO
+
+
+def __getattr__(name):
+    """Lazily resolve ``scrape_<key>`` and utility names on first access."""
+    if name.startswith('scrape_'):
+        key = name[len('scrape_'):]
+        if key in available_scrapers():
+            return load_scraper(key)[0]
+    if name == 'get_week_dates':
+        from .utils import get_week_dates
+        return get_week_dates
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,12 @@
-"""Scraper for Alamo Drafthouse Wrigleyville."""
-from .utils import make_request, logger
+"""Scraper for Alamo Drafthouse Wrigleyville (and other Chicago Alamos)."""
+from .utils import make_request, record_fetch_failure, logger
 import json
 from datetime import datetime
-from collections import defaultdict
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 
 THEATER_INFO = {
@@ -14,101 +18,164 @@ THEATER_INFO = {
 # Wrigleyville cinema ID
 WRIGLEYVILLE_CINEMA_ID = '1801'
 
+# Cinemas to pull out of the Chicago market schedule, by cinema ID. Every
+# cinema comes from the same single download, so adding one here costs no
+# extra requests.
+CINEMAS = {
+    WRIGLEYVILLE_CINEMA_ID: THEATER_INFO,
+}
+
+MARKET_API_URL = 'https://drafthouse.com/s/mother/v2/schedule/market/chicago'
+
+# Presentations with these words in the title aren't films
+SKIP_WORDS = ['menu', 'gift', 'membership', 'party', 'rental', 'private']
+
+# JSON paths of the arrays we read from the market payload
+ITEM_PREFIXES = {
+    'data.presentations.item': 'presentation',
+    'data.sessions.item': 'session',
+}
+
+
+def iter_market_items(stream):
+    """Yield (kind, item) for each presentation and session in the payload.
+
+    Items are built one at a time from parser events, so only the current
+    item is ever held in memory rather than the whole market schedule.
+    """
+    builder = None
+    item_prefix = None
+
+    for prefix, event, value in ijson.parse(stream):
+        if builder is None:
+            if event == 'start_map' and prefix in ITEM_PREFIXES:
+                builder = ijson.ObjectBuilder()
+                item_prefix = prefix
+                builder.event(event, value)
+            continue
+
+        builder.event(event, value)
+        if event == 'end_map' and prefix == item_prefix:
+            yield ITEM_PREFIXES[item_prefix], builder.value
+            builder = None
+
+
+def iter_market_items_buffered(content):
+    """Fallback for iter_market_items when ijson isn't installed."""
+    data = json.loads(content).get('data', {})
+    for p in data.get('presentations', []):
+        yield 'presentation', p
+    for s in data.get('sessions', []):
+        yield 'session', s
+
+
+def parse_presentation(p):
+    """Reduce a presentation to (title, year, show slug), or None to skip it."""
+    slug = p.get('slug')
+    show = p.get('show', {})
+    if not slug or not show:
+        return None
+
+    title = show.get('title', '')
+    if any(s in title.lower() for s in SKIP_WORDS):
+        return None
 
-def scrape_alamo():
-    """Scrape Alamo Drafthouse Wrigleyville schedule via their API."""
+    return title, show.get('year'), show.get('slug', slug)
+
+
+def parse_session_time(show_time_str):
+    """Split a session's showTimeClt into (date, time) strings."""
+    try:
+        dt = datetime.fromisoformat(show_time_str.replace('Z', '+00:00'))
+    except (ValueError, TypeError):
+        return None
+    return dt.strftime('%Y-%m-%d'), dt.strftime('%-I:%M %p')
+
+
+def scrape_alamo(cinema_ids=None):
+    """Scrape Alamo Drafthouse schedules from the Chicago market API.
+
+    `cinema_ids` picks which entries of CINEMAS to keep (default: all of them).
+    """
     movies = []
 
-    api_url = 'https://drafthouse.com/s/mother/v2/schedule/market/chicago'
+    cinemas = CINEMAS if cinema_ids is None else {
+        cid: CINEMAS[cid] for cid in map(str, cinema_ids) if cid in CINEMAS
+    }
 
-    resp = make_request(api_url)
+    resp = make_request(MARKET_API_URL, stream=ijson is not None)
     if not resp:
         logger.error("Failed to fetch Alamo Drafthouse API")
         return movies
 
+    # presentation slug -> (title, year, show slug), or None for non-films
+    presentations = {}
+    # (presentation slug, cinema id, date) -> set of times
+    showtimes = {}
+
     try:
-        data = resp.json().get('data', {})
-    except json.JSONDecodeError:
-        logger.error("Failed to parse Alamo Drafthouse JSON")
+        if ijson is not None:
+            resp.raw.decode_content = True
+            items = iter_market_items(resp.raw)
+        else:
+            items = iter_market_items_buffered(resp.content)
+
+        for kind, item in items:
+            if kind == 'presentation':
+                slug = item.get('slug')
+                if slug:
+                    presentations[slug] = parse_presentation(item)
+                continue
+
+            cinema_id = str(item.get('cinemaId', ''))
+            if cinema_id not in cinemas:
+                continue
+
+            pslug = item.get('presentationSlug')
+            parsed = parse_session_time(item.get('showTimeClt', ''))
+            if not pslug or not parsed:
+                continue
+
+            date_str, time_str = parsed
+            showtimes.setdefault((pslug, cinema_id, date_str), set()).add(time_str)
+    except (ValueError, json.JSONDecodeError) as e:
+        # ijson raises its own errors, all subclasses of ValueError
+        logger.error(f"Failed to parse Alamo Drafthouse JSON: {e}")
+        record_fetch_failure()
         return movies
 
-    # Build presentation lookup (slug -> title)
-    presentations = data.get('presentations', [])
-    pres_lookup = {}
-    for p in presentations:
-        slug = p.get('slug')
-        show = p.get('show', {})
-        if slug and show:
-            pres_lookup[slug] = {
-                'title': show.get('title', ''),
-                'year': show.get('year'),
-                'slug': show.get('slug', slug)
-            }
-
-    # Get sessions (actual showtimes)
-    sessions = data.get('sessions', [])
-
-    # Group sessions by movie and date
-    movie_sessions = defaultdict(lambda: defaultdict(list))
-
-    for session in sessions:
-        # Filter to Wrigleyville only
-        cinema_id = str(session.get('cinemaId', ''))
-        if cinema_id != WRIGLEYVILLE_CINEMA_ID:
+    # Convert to movie entries, merging presentations that share a title
+    by_screening = {}
+    for (pslug, cinema_id, date_str), times in showtimes.items():
+        info = presentations.get(pslug)
+        if not info:
             continue
-
-        pslug = session.get('presentationSlug')
-        if pslug not in pres_lookup:
+        title, year, slug = info
+        key = (title, cinema_id, date_str)
+        if key in by_screening:
+            by_screening[key]['times'].update(times)
             continue
-
-        # Parse date and time
-        show_time_str = session.get('showTimeClt', '')
-        if not show_time_str:
-            continue
-
-        try:
-            dt = datetime.fromisoformat(show_time_str.replace('Z', '+00:00'))
-            date_str = dt.strftime('%Y-%m-%d')
-            time_str = dt.strftime('%-I:%M %p')
-        except (ValueError, TypeError):
-            continue
-
-        movie_info = pres_lookup[pslug]
-        title = movie_info['title']
-
-        # Skip non-movie items
-        skip = ['menu', 'gift', 'membership', 'party', 'rental', 'private']
-        if any(s in title.lower() for s in skip):
-            continue
-
-        movie_sessions[title][date_str].append({
-            'time': time_str,
-            'year': movie_info.get('year'),
-            'slug': movie_info.get('slug')
+        by_screening[key] = {'times': set(times), 'year': year, 'slug': slug}
+
+    for (title, cinema_id, date_str), entry in by_screening.items():
+        theater = cinemas[cinema_id]
+        slug = entry['slug']
+        ticket_url = f"https://drafthouse.com/chicago/show/{slug}" if slug else theater['url']
+        times = sorted(entry['times'])
+
+        movies.append({
+            'title': title,
+            'theater': theater['name'],
+            'theater_url': theater['url'],
+            'address': theater['address'],
+            'date': date_str,
+            'times': times if times else ['See website'],
+            'format': None,
+            'director': None,
+            'year': entry['year'],
+            'ticket_url': ticket_url
         })
 
-    # Convert to movie entries
-    for title, dates in movie_sessions.items():
-        for date_str, times_list in dates.items():
-            times = sorted(set(t['time'] for t in times_list))
-            year = times_list[0].get('year')
-            slug = times_list[0].get('slug', '')
-
-            ticket_url = f"https://drafthouse.com/chicago/show/{slug}" if slug else THEATER_INFO['url']
-
-            movies.append({
-                'title': title,
-                'theater': THEATER_INFO['name'],
-                'theater_url': THEATER_INFO['url'],
-                'address': THEATER_INFO['address'],
-                'date': date_str,
-                'times': times if times else ['See website'],
-                'format': None,
-                'director': None,
-                'year': year,
-                'ticket_url': ticket_url
-            })
-
     logger.info(f"Alamo Drafthouse: Found {len(movies)} screenings")
     return movies
 
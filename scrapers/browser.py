@@ -0,0 +1,125 @@
+"""Shared headless Chromium pool for JavaScript-rendered theaters.
+
+One browser process serves every scraper. Pages are borrowed with
+``new_page()``; each gets its own context with the pool's request-blocking
+rules and timeouts applied. Playwright's sync API is bound to the thread
+that started it, so the pool is only used from the scraping thread and
+pages render one at a time; what it saves is the browser launch.
+"""
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from .utils import DEFAULT_HEADERS, budget_timeout, logger
+
+# Most pages borrowed and not yet returned (e.g. nested new_page() blocks);
+# guards against leaked pages, since only one renders at a time
+MAX_OPEN_PAGES = 4
+
+# Default timeout for page actions and navigation, in seconds
+PAGE_TIMEOUT = 30
+
+# Resources no scraper needs to read a schedule
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+
+# Trackers and ad networks; suffix match on the request host
+BLOCKED_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'facebook.net',
+    'facebook.com', 'hotjar.com', 'clarity.ms', 'tiktok.com', 'adsrvr.org',
+)
+
+_playwright = None
+_browser = None
+_keep_warm = False
+_borrowed = 0
+
+
+def keep_warm(enabled=True):
+    """Keep the browser running between pages (for long-lived processes)."""
+    global _keep_warm
+    _keep_warm = enabled
+    if not enabled and not _borrowed:
+        close_browser()
+
+
+def get_browser():
+    """Return the running browser, launching it if needed."""
+    global _playwright, _browser
+    if _browser is None or not _browser.is_connected():
+        from playwright.sync_api import sync_playwright
+
+        if _playwright is None:
+            _playwright = sync_playwright().start()
+        _browser = _playwright.chromium.launch(headless=True)
+        logger.info("Launched headless Chromium")
+    return _browser
+
+
+def close_browser():
+    """Shut down the browser and Playwright."""
+    global _playwright, _browser
+    if _browser is not None:
+        try:
+            _browser.close()
+        except Exception:
+            pass
+        _browser = None
+    if _playwright is not None:
+        try:
+            _playwright.stop()
+        except Exception:
+            pass
+        _playwright = None
+
+
+def blocked(request):
+    """Whether the pool's rules drop a request."""
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlparse(request.url).hostname or ''
+    return any(host == h or host.endswith('.' + h) for h in BLOCKED_HOSTS)
+
+
+def _route(route):
+    if blocked(route.request):
+        route.abort()
+    else:
+        route.continue_()
+
+
+def _open_page():
+    """Open a page in a fresh context with the shared rules."""
+    global _borrowed
+    if _borrowed >= MAX_OPEN_PAGES:
+        # Nothing else can free a page on this thread, so waiting would never end
+        raise RuntimeError(f"Too many browser pages open ({MAX_OPEN_PAGES})")
+    _borrowed += 1
+    try:
+        context = get_browser().new_context(user_agent=DEFAULT_HEADERS['User-Agent'])
+        context.set_default_timeout(budget_timeout(PAGE_TIMEOUT) * 1000)
+        context.route('**/*', _route)
+        return context.new_page()
+    except Exception:
+        _release(None)
+        raise
+
+
+def _release(page):
+    """Close a borrowed page's context (and the browser, unless kept warm)."""
+    global _borrowed
+    if page is not None:
+        try:
+            page.context.close()
+        except Exception:
+            pass
+    _borrowed -= 1
+    if not _keep_warm and not _borrowed:
+        close_browser()
+
+
+@contextmanager
+def new_page():
+    """Borrow a page from the pool, returning it when the block exits."""
+    page = _open_page()
+    try:
+        yield page
+    finally:
+        _release(page)
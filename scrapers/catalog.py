@@ -0,0 +1,311 @@
+"""Local film catalog for resolving titles to Letterboxd slugs without probing URLs.
+
+The catalog maps Letterboxd slugs to a title, year, director and any other
+titles the film has been listed under. It can be seeded from a dump
+(``python -m scrapers.catalog import films.csv``) and grows from every
+successful Letterboxd lookup, so most titles resolve with zero or one
+request instead of a series of guessed slugs.
+"""
+import csv
+import json
+import re
+import sys
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+from pathlib import Path
+from .utils import write_json_atomic, logger
+
+CATALOG_FILE = Path(__file__).parent.parent / 'data' / 'film_catalog.json'
+
+# Minimum title similarity (0-1) for a catalog entry to be considered at all
+TITLE_THRESHOLD = 0.85
+# Minimum overall score for a match to be used
+MATCH_THRESHOLD = 0.9
+# Candidates examined per lookup when falling back to fuzzy matching
+MAX_CANDIDATES = 200
+# Minimum score for a matched title to be recorded as another name for the film
+VARIANT_THRESHOLD = 1.25
+
+LEADING_ARTICLES = ('the ', 'a ', 'an ')
+
+ROMAN_NUMERALS = {'i': 1, 'ii': 2, 'iii': 3, 'iv': 4, 'v': 5, 'vi': 6, 'vii': 7, 'viii': 8, 'ix': 9, 'x': 10}
+# Words after which a lone "i" is a numeral rather than the pronoun
+NUMBERING_WORDS = {'part', 'vol', 'volume', 'chapter', 'episode', 'book'}
+
+_lock = threading.Lock()
+_films = None
+_by_title = None
+_by_word = None
+# Slugs added or updated since the catalog was last written
+_changed = set()
+# Set in shard processes, whose changes are merged and written by the parent
+_hold_writes = False
+
+
+def normalize_title(title):
+    """Fold a title for matching: no accents, punctuation, case, parentheticals or leading article."""
+    text = re.sub(r'\s*[(\[][^)\]]*[)\]]', '', title or '')
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    text = text.replace('&', ' and ')
+    text = ' '.join(re.sub(r'[^\w\s]', ' ', text).split())
+    for article in LEADING_ARTICLES:
+        if text.startswith(article):
+            text = text[len(article):]
+            break
+    return text
+
+
+def title_numbers(norm):
+    """The numbers in a normalized title, with roman numerals converted ("part ii" -> [2])."""
+    numbers = []
+    words = norm.split()
+    for i, word in enumerate(words):
+        if word.isdigit():
+            numbers.append(int(word))
+        elif word in ROMAN_NUMERALS and (word != 'i' or (i and words[i - 1] in NUMBERING_WORDS)):
+            numbers.append(ROMAN_NUMERALS[word])
+    return sorted(numbers)
+
+
+def slug_from_url(url):
+    """Extract the film slug from a letterboxd.com/film/<slug>/ URL."""
+    match = re.search(r'letterboxd\.com/film/([^/?#]+)', url or '')
+    return match.group(1) if match else None
+
+
+def _index_film(slug, entry):
+    for variant in [entry.get('title')] + entry.get('variants', []):
+        norm = normalize_title(variant)
+        if not norm:
+            continue
+        _by_title.setdefault(norm, set()).add(slug)
+        for word in norm.split():
+            _by_word.setdefault(word, set()).add(slug)
+
+
+def load_catalog():
+    """Load the catalog and build its title indexes (once per process)."""
+    global _films, _by_title, _by_word
+    with _lock:
+        if _films is None:
+            try:
+                with open(CATALOG_FILE) as f:
+                    _films = json.load(f).get('films', {})
+            except (OSError, ValueError):
+                _films = {}
+            _by_title = {}
+            _by_word = {}
+            for slug, entry in _films.items():
+                _index_film(slug, entry)
+    return _films
+
+
+def save_catalog():
+    """Write any added entries to disk, merged with what's there now.
+
+    Re-reading the file first keeps entries another process wrote since
+    this one loaded the catalog.
+    """
+    with _lock:
+        if _hold_writes or not _changed:
+            return
+        try:
+            with open(CATALOG_FILE) as f:
+                films = json.load(f).get('films', {})
+        except (OSError, ValueError):
+            films = {}
+        films.update((slug, _films[slug]) for slug in _changed)
+        write_json_atomic(CATALOG_FILE, {'version': 1, 'films': films})
+        _changed.clear()
+
+
+def hold_writes():
+    """Keep changes in memory instead of saving them; see take_changes()."""
+    global _hold_writes
+    _hold_writes = True
+
+
+def take_changes():
+    """Return {slug: entry} for the entries changed since the last save, and forget them."""
+    with _lock:
+        changes = {slug: _films[slug] for slug in _changed}
+        _changed.clear()
+    return changes
+
+
+def merge_changes(changes):
+    """Add entries returned by take_changes() in another process, then save."""
+    for slug, entry in changes.items():
+        add_film(slug, entry['title'], entry.get('year'), entry.get('director'),
+                 entry.get('variants', ()), entry.get('info'))
+    save_catalog()
+
+
+def add_film(slug, title, year=None, director=None, variants=(), info=None):
+    """Add or update a catalog entry.
+
+    `variants` are other titles the film is listed under; `info` is the
+    Letterboxd data for it, kept so later matches need no request at all.
+    """
+    if not slug or not title:
+        return
+    load_catalog()
+    with _lock:
+        entry = _films.setdefault(slug, {'title': title})
+        if year and not entry.get('year'):
+            entry['year'] = int(year)
+        if director and not entry.get('director'):
+            entry['director'] = director
+        known = {normalize_title(v) for v in [entry['title']] + entry.get('variants', [])}
+        for variant in variants:
+            if variant and normalize_title(variant) not in known:
+                entry.setdefault('variants', []).append(variant)
+                known.add(normalize_title(variant))
+        if info:
+            entry['info'] = info
+        _index_film(slug, entry)
+        _changed.add(slug)
+
+
+def get_film(slug):
+    """Return the catalog entry for a slug, or None."""
+    return load_catalog().get(slug)
+
+
+def _candidates(norm):
+    """Slugs worth scoring: exact title matches, else films sharing the title's rarest word."""
+    exact = _by_title.get(norm)
+    if exact:
+        return exact
+    words = [w for w in norm.split() if w in _by_word]
+    if not words:
+        return set()
+    rarest = min(words, key=lambda w: len(_by_word[w]))
+    return set(list(_by_word[rarest])[:MAX_CANDIDATES])
+
+
+def _director_score(wanted, found):
+    """+0.2 when directors agree, -0.3 when they clearly don't, 0 if unknown."""
+    if not wanted or not found:
+        return 0
+    a, b = normalize_title(wanted), normalize_title(found)
+    if a == b or a.split()[-1:] == b.split()[-1:]:
+        return 0.2
+    return 0.2 if SequenceMatcher(None, a, b).ratio() >= 0.8 else -0.3
+
+
+def _year_score(wanted, found):
+    """+0.3 for the same year, rejection for any other year, 0 if unknown."""
+    if not wanted or not found:
+        return 0
+    return 0.3 if int(wanted) == int(found) else None
+
+
+def match_film(title, year=None, director=None):
+    """Return the best catalog slug for a title, or None if nothing is convincing."""
+    return best_match(title, year, director)[0]
+
+
+def best_match(title, year=None, director=None):
+    """Return (slug, score) for the best catalog match, or (None, None).
+
+    Titles are compared fuzzily, but never across different numbers, so
+    sequels and numbered parts stay apart. The scraped year (which must
+    match exactly when both are known) and director then confirm or rule
+    out candidates, which is what separates remakes. Without either, a
+    title shared by several films is treated as ambiguous.
+    """
+    norm = normalize_title(title)
+    if not norm:
+        return None, None
+    load_catalog()
+    numbers = title_numbers(norm)
+
+    scored = []
+    with _lock:
+        for slug in _candidates(norm):
+            entry = _films[slug]
+            similarity = 0
+            for variant in [entry.get('title')] + entry.get('variants', []):
+                variant = normalize_title(variant)
+                if title_numbers(variant) == numbers:
+                    similarity = max(similarity, SequenceMatcher(None, norm, variant).ratio())
+            if similarity < TITLE_THRESHOLD:
+                continue
+            year_score = _year_score(year, entry.get('year'))
+            if year_score is None:
+                continue
+            score = similarity + year_score + _director_score(director, entry.get('director'))
+            scored.append((score, slug))
+
+    if not scored:
+        return None, None
+    scored.sort(reverse=True)
+    best_score, best_slug = scored[0]
+    if best_score < MATCH_THRESHOLD:
+        return None, None
+    if len(scored) > 1 and not (year or director) and best_score - scored[1][0] < 0.05:
+        return None, None
+    return best_slug, best_score
+
+
+def _first(row, *names):
+    for name in names:
+        value = row.get(name)
+        if value:
+            return value.strip() if isinstance(value, str) else value
+    return None
+
+
+def import_dump(path):
+    """Import films from a CSV, JSON list or JSON-lines dump. Returns the number imported.
+
+    Recognised fields: slug (or a letterboxd.com/film/... url/uri), title or
+    name, year, director(s) (a list is joined), and variants (a list, or "|"-separated).
+    """
+    path = Path(path)
+    with open(path, newline='') as f:
+        if path.suffix == '.csv':
+            rows = list(csv.DictReader(f))
+        else:
+            text = f.read()
+            try:
+                rows = json.loads(text)
+            except ValueError:
+                rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    count = 0
+    for row in rows:
+        row = {str(k).strip().lower().replace(' ', '_'): v for k, v in row.items()}
+        slug = _first(row, 'slug', 'letterboxd_slug') or slug_from_url(
+            _first(row, 'letterboxd_uri', 'letterboxd_url', 'url', 'uri', 'link'))
+        title = _first(row, 'title', 'name', 'film_name')
+        year = _first(row, 'year', 'release_year')
+        variants = _first(row, 'variants', 'alternative_titles') or []
+        if isinstance(variants, str):
+            variants = [v.strip() for v in variants.split('|')]
+        director = _first(row, 'director', 'directors')
+        if isinstance(director, list):
+            director = ', '.join(str(d).strip() for d in director if d) or None
+        try:
+            year = int(year) if year else None
+        except (TypeError, ValueError):
+            year = None
+        if slug and title:
+            add_film(slug, title, year, director, variants)
+            count += 1
+
+    save_catalog()
+    logger.info(f"Imported {count} films into {CATALOG_FILE}")
+    return count
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == 'import':
+        import_dump(sys.argv[2])
+    elif len(sys.argv) == 2 and sys.argv[1] == 'stats':
+        print(f"{len(load_catalog())} films in {CATALOG_FILE}")
+    else:
+        print("usage: python -m scrapers.catalog import <dump.csv|dump.json> | stats")
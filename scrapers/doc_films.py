@@ -1,6 +1,6 @@
 """Scraper for Doc Films (University of Chicago)."""
 from bs4 import BeautifulSoup
-from .utils import make_request, parse_date, parse_time, clean_text, logger
+from .utils import make_request, parse_cached, parse_many, parse_date, parse_time, clean_text, logger
 import re
 from datetime import datetime
 
@@ -21,7 +21,12 @@ def get_series_urls():
     if not resp:
         return []
 
-    soup = BeautifulSoup(resp.text, 'lxml')
+    return parse_cached(calendar_url, resp.text, parse_calendar_html, base_url)
+
+
+def parse_calendar_html(html, base_url):
+    """Extract series page URLs from the calendar page HTML."""
+    soup = BeautifulSoup(html, 'lxml')
     series_urls = set()
 
     # Find all series links (format: /calendar/2026winter/series-name)
@@ -31,20 +36,24 @@ def get_series_urls():
             full_url = base_url + href
             series_urls.add(full_url)
 
-    return list(series_urls)
+    return sorted(series_urls)
 
 
-def parse_series_page(url):
-    """Parse a series page and extract all screenings."""
-    movies = []
-    base_url = 'https://docfilms.org'
+def parse_series_pages(urls):
+    """Fetch series pages and parse them together, returning each page's screenings."""
     current_year = datetime.now().year
+    jobs = []
+    for url in urls:
+        resp = make_request(url)
+        if resp:
+            jobs.append((url, resp.text, parse_series_html, url, current_year))
+    return parse_many(jobs)
 
-    resp = make_request(url)
-    if not resp:
-        return movies
 
-    soup = BeautifulSoup(resp.text, 'lxml')
+def parse_series_html(html, url, current_year):
+    """Extract screenings from a series page's HTML."""
+    movies = []
+    soup = BeautifulSoup(html, 'lxml')
 
     # Find all screening divs
     screenings = soup.find_all('div', class_='screening')
@@ -126,9 +135,8 @@ def scrape_doc_films():
     series_urls = get_series_urls()
     logger.info(f"Doc Films: Found {len(series_urls)} series pages")
 
-    # Parse each series page
-    for url in series_urls:
-        page_movies = parse_series_page(url)
+    # Parse the series pages (in worker processes when there are several)
+    for page_movies in parse_series_pages(series_urls):
         for movie in page_movies:
             # Deduplicate by title+date+time
             key = f"{movie['title']}|{movie['date']}|{movie['times'][0]}"
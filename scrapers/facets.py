@@ -1,6 +1,6 @@
 """Scraper for Facets Cinematheque."""
 from bs4 import BeautifulSoup
-from .utils import make_request, parse_date, parse_time, clean_text, logger
+from .utils import make_request, parse_cached, parse_date, parse_time, clean_text, logger
 import re
 from datetime import datetime
 
@@ -14,17 +14,28 @@ THEATER_INFO = {
 
 def scrape_facets():
     """Scrape Facets screening schedule."""
-    movies = []
     base_url = 'https://facets.org'
+    cinema_url = f'{base_url}/cinema/'
 
     # Use cinema page which lists screenings
-    resp = make_request(f'{base_url}/cinema/')
+    resp = make_request(cinema_url)
     if not resp:
         logger.error("Failed to fetch Facets")
-        return movies
+        return []
+
+    # Undated items fall back to today, so today is part of the cache key too
+    today = datetime.now().strftime('%Y-%m-%d')
+    movies = parse_cached(cinema_url, resp.text, parse_cinema_html, base_url, today)
+
+    logger.info(f"Facets: Found {len(movies)} screenings")
+    return movies
+
 
-    soup = BeautifulSoup(resp.text, 'lxml')
-    current_year = datetime.now().year
+def parse_cinema_html(html, base_url, today):
+    """Extract screenings from the cinema page HTML."""
+    movies = []
+    soup = BeautifulSoup(html, 'lxml')
+    current_year = int(today[:4])
 
     # Facets uses portfolio list items with class 'edgtf-pli-title'
     # Find all portfolio items
@@ -70,7 +81,7 @@ def scrape_facets():
             date_str = parse_date(date_match.group(0), current_year)
 
         if not date_str:
-            date_str = datetime.now().strftime('%Y-%m-%d')
+            date_str = today
 
         # Find times
         time_matches = re.findall(r'(\d{1,2}:\d{2}\s*(?:pm|am)?)', text, re.I)
@@ -98,7 +109,6 @@ def scrape_facets():
             'ticket_url': event_url
         })
 
-    logger.info(f"Facets: Found {len(movies)} screenings")
     return movies
 
 
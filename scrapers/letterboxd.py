@@ -3,28 +3,96 @@ import requests
 from bs4 import BeautifulSoup
 import re
 import json
+import queue
+import threading
+import time
 from pathlib import Path
-from .utils import logger
+from . import catalog
+from .utils import get_session, write_json_atomic, circuit_open, deadline_passed, budget_timeout, record_failure, record_success, logger
 
+LETTERBOXD_URL = 'https://letterboxd.com'
 CACHE_FILE = Path(__file__).parent.parent / 'data' / 'letterboxd_cache.json'
 
+# Seconds between network lookups during a prefetch, to stay polite off-peak
+PREFETCH_DELAY = 2
+
+# The cache is read from disk once per process and kept in memory after that
+_cache = None
+# Entries looked up since the cache was last written
+_new_entries = {}
+# Set in shard processes, whose lookups are merged and written by the parent
+_hold_writes = False
+
 
 def load_cache():
     """Load cached Letterboxd data."""
-    if CACHE_FILE.exists():
-        try:
-            with open(CACHE_FILE) as f:
-                return json.load(f)
-        except:
-            pass
-    return {}
+    global _cache
+    if _cache is None:
+        _cache = {}
+        if CACHE_FILE.exists():
+            try:
+                with open(CACHE_FILE) as f:
+                    _cache = json.load(f)
+            except:
+                pass
+    return _cache
+
+
+def save_cache():
+    """Write new lookups to the cache file, merged with what's there now.
+
+    Re-reading the file first keeps lookups another process wrote since this
+    one loaded the cache.
+    """
+    if _hold_writes or not _new_entries:
+        return
+    try:
+        with open(CACHE_FILE) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    cache.update(_new_entries)
+    write_json_atomic(CACHE_FILE, cache, indent=2)
+    _new_entries.clear()
+
+
+def store_result(cache_key, info):
+    """Cache a lookup result (None for a miss); it's written by the next save_lookups()."""
+    load_cache()[cache_key] = info
+    _new_entries[cache_key] = info
+
+
+def save_lookups():
+    """Write the lookups and catalog entries gathered since the last save."""
+    save_cache()
+    catalog.save_catalog()
+
+
+def hold_writes():
+    """Keep new cache and catalog entries in memory instead of saving them.
 
+    Used by shard processes: the parent collects the entries with
+    take_new_entries() and writes them, so shards can't overwrite each
+    other's lookups.
+    """
+    global _hold_writes
+    _hold_writes = True
+    catalog.hold_writes()
 
-def save_cache(cache):
-    """Save Letterboxd cache."""
-    CACHE_FILE.parent.mkdir(exist_ok=True)
-    with open(CACHE_FILE, 'w') as f:
-        json.dump(cache, f, indent=2)
+
+def take_new_entries():
+    """Return and forget the cache and catalog entries added since the last save."""
+    entries = {'cache': dict(_new_entries), 'catalog': catalog.take_changes()}
+    _new_entries.clear()
+    return entries
+
+
+def merge_new_entries(entries):
+    """Add entries from take_new_entries() in another process, then save them."""
+    load_cache().update(entries['cache'])
+    _new_entries.update(entries['cache'])
+    save_cache()
+    catalog.merge_changes(entries['catalog'])
 
 
 def clean_title(title):
@@ -72,25 +140,143 @@ def extract_year_from_page(soup):
 
 def try_fetch_url(url, headers):
     """Try to fetch a URL and return soup if successful."""
+    if circuit_open(url) or deadline_passed():
+        return None, None
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
-        if resp.status_code == 200:
-            return BeautifulSoup(resp.text, 'lxml'), url
-    except:
-        pass
+        resp = get_session().get(url, headers=headers, timeout=budget_timeout(10))
+    except requests.RequestException:
+        record_failure(url)
+        return None, None
+    if resp.status_code >= 500:
+        record_failure(url)
+        return None, None
+    record_success(url)
+    if resp.status_code == 200:
+        return BeautifulSoup(resp.text, 'lxml'), url
     return None, None
 
 
-def fetch_letterboxd_info(title, year=None):
-    """Fetch movie info from Letterboxd."""
+def lookups_blocked():
+    """Whether Letterboxd can't be reached right now (breaker open or out of time)."""
+    return circuit_open(LETTERBOXD_URL) or deadline_passed()
+
+
+def parse_film_page(soup, url):
+    """Extract film info from a Letterboxd film page."""
+    info = {
+        'letterboxd_url': url,
+        'title': None,
+        'director': None,
+        'rating': None,
+        'tagline': None,
+        'description': None,
+        'poster': None
+    }
+
+    # Title
+    title_elem = soup.find('h1', class_='headline-1')
+    if title_elem:
+        info['title'] = title_elem.get_text(strip=True)
+
+    # Director
+    director = soup.find('a', href=lambda x: x and '/director/' in x)
+    if director:
+        info['director'] = director.get_text(strip=True)
+
+    # Rating (from meta tag)
+    rating = soup.find('meta', {'name': 'twitter:data2'})
+    if rating:
+        rating_text = rating.get('content', '')
+        match = re.search(r'([\d.]+)', rating_text)
+        if match:
+            info['rating'] = match.group(1)
+
+    # Tagline
+    tagline = soup.find('h4', class_='tagline')
+    if tagline:
+        info['tagline'] = tagline.get_text(strip=True)
+
+    # Description
+    desc = soup.find('div', class_='truncate')
+    if desc:
+        info['description'] = desc.get_text(strip=True)[:200]
+
+    # Poster
+    poster_div = soup.find('div', class_='film-poster')
+    if poster_div:
+        img = poster_div.find('img')
+        if img and img.get('src'):
+            info['poster'] = img.get('src')
+
+    return info
+
+
+def fetch_from_catalog(title, year, director, headers):
+    """Resolve a title through the local film catalog.
+
+    Returns (info, found): info is None with found=False when the catalog
+    has no convincing match, so the caller can fall back to guessing slugs.
+    Catalog entries that already carry Letterboxd info need no request.
+    """
+    slug, score = catalog.best_match(title, year, director)
+    if not slug:
+        return None, False
+
+    entry = catalog.get_film(slug)
+    if entry.get('info'):
+        # Only a near-certain match teaches the catalog a new name for the film
+        if score >= catalog.VARIANT_THRESHOLD:
+            catalog.add_film(slug, entry['title'], variants=[title])
+        return entry['info'], True
+
+    soup, url = try_fetch_url(f'https://letterboxd.com/film/{slug}/', headers)
+    if not soup:
+        return None, False
+
+    info = parse_film_page(soup, url)
+    remember_film(url, soup, info, title, as_variant=score >= catalog.VARIANT_THRESHOLD)
+    return info, True
+
+
+def remember_film(url, soup, info, listed_title, as_variant=True):
+    """Add a successfully resolved film to the catalog.
+
+    With `as_variant`, the title it was listed under is recorded as another
+    name for it.
+    """
+    slug = catalog.slug_from_url(url)
+    catalog.add_film(slug, info['title'] or listed_title, extract_year_from_page(soup),
+                     info['director'], variants=[listed_title] if as_variant else (), info=info)
+
+
+def cache_key_for(title, year=None):
+    """Key for a title in the Letterboxd cache."""
+    return f"{title}|{year}" if year else title
+
+
+def fetch_letterboxd_info(title, year=None, director=None):
+    """Fetch movie info from Letterboxd.
+
+    The local film catalog is tried first (using year and director to pick
+    between films sharing a title); only titles it can't place fall back to
+    guessing slugs.
+    """
     cache = load_cache()
+    headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)'}
 
-    cache_key = f"{title}|{year}" if year else title
-    if cache_key in cache:
+    cache_key = cache_key_for(title, year)
+    if cache.get(cache_key) is not None:
         return cache[cache_key]
 
+    info, found = fetch_from_catalog(title, year, director, headers)
+    if found:
+        store_result(cache_key, info)
+        return info
+    if cache_key in cache:
+        # A remembered miss; only the catalog can change that
+        return None
+
     slug = title_to_slug(title)
-    headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)'}
 
     soup = None
     url = None
@@ -128,63 +314,35 @@ def fetch_letterboxd_info(title, year=None):
                     page_year = extract_year_from_page(soup)
                     if page_year and page_year != year:
                         logger.warning(f"Letterboxd year mismatch for {title}: wanted {year}, got {page_year}")
-                        cache[cache_key] = None
-                        save_cache(cache)
+                        store_result(cache_key, None)
                         return None
 
     if not soup:
-        cache[cache_key] = None
-        save_cache(cache)
+        if lookups_blocked():
+            # Don't remember a miss we never actually checked
+            return None
+        store_result(cache_key, None)
         return None
 
-    info = {
-        'letterboxd_url': url,
-        'title': None,
-        'director': None,
-        'rating': None,
-        'tagline': None,
-        'description': None,
-        'poster': None
-    }
-
-    # Title
-    title_elem = soup.find('h1', class_='headline-1')
-    if title_elem:
-        info['title'] = title_elem.get_text(strip=True)
+    info = parse_film_page(soup, url)
+    remember_film(url, soup, info, title)
 
-    # Director
-    director = soup.find('a', href=lambda x: x and '/director/' in x)
-    if director:
-        info['director'] = director.get_text(strip=True)
-
-    # Rating (from meta tag)
-    rating = soup.find('meta', {'name': 'twitter:data2'})
-    if rating:
-        rating_text = rating.get('content', '')
-        match = re.search(r'([\d.]+)', rating_text)
-        if match:
-            info['rating'] = match.group(1)
+    store_result(cache_key, info)
+    return info
 
-    # Tagline
-    tagline = soup.find('h4', class_='tagline')
-    if tagline:
-        info['tagline'] = tagline.get_text(strip=True)
 
-    # Description
-    desc = soup.find('div', class_='truncate')
-    if desc:
-        info['description'] = desc.get_text(strip=True)[:200]
+def title_key(movie):
+    """Key grouping a movie's screenings for lookup: title plus year, if any."""
+    return f"{movie['title']}|{movie.get('year', '')}"
 
-    # Poster
-    poster_div = soup.find('div', class_='film-poster')
-    if poster_div:
-        img = poster_div.find('img')
-        if img and img.get('src'):
-            info['poster'] = img.get('src')
 
-    cache[cache_key] = info
-    save_cache(cache)
-    return info
+def attach_info(movies, title_info):
+    """Add looked-up Letterboxd info ({title_key: info}) to each screening."""
+    for movie in movies:
+        info = title_info.get(title_key(movie))
+        if info:
+            movie['letterboxd'] = info
+    return movies
 
 
 def enrich_movies_with_letterboxd(movies):
@@ -192,25 +350,124 @@ def enrich_movies_with_letterboxd(movies):
     # Get unique titles with years
     unique_titles = {}
     for movie in movies:
-        key = f"{movie['title']}|{movie.get('year', '')}"
-        if key not in unique_titles:
-            unique_titles[key] = (movie['title'], movie.get('year'))
+        key = title_key(movie)
+        if key not in unique_titles or (movie.get('director') and not unique_titles[key][2]):
+            unique_titles[key] = (movie['title'], movie.get('year'), movie.get('director'))
 
     # Fetch info for each unique title
     logger.info(f"Fetching Letterboxd info for {len(unique_titles)} unique films...")
     title_info = {}
-    for key, (title, year) in unique_titles.items():
-        info = fetch_letterboxd_info(title, year)
-        if info:
-            title_info[key] = info
+    try:
+        for key, (title, year, director) in unique_titles.items():
+            # Cached titles still resolve once lookups are blocked; the rest are skipped
+            info = fetch_letterboxd_info(title, year, director)
+            if info:
+                title_info[key] = info
+    finally:
+        save_lookups()
 
-    logger.info(f"Found Letterboxd data for {len(title_info)} films")
+    if lookups_blocked():
+        logger.warning("Letterboxd lookups were cut short (host down or build deadline reached)")
 
-    # Add info to movies
-    for movie in movies:
-        key = f"{movie['title']}|{movie.get('year', '')}"
-        info = title_info.get(key)
-        if info:
-            movie['letterboxd'] = info
+    logger.info(f"Found Letterboxd data for {len(title_info)} films")
 
-    return movies
+    return attach_info(movies, title_info)
+
+
+class EnrichmentPipeline:
+    """Looks up Letterboxd info on a background thread while scraping carries on.
+
+    Each scraper's screenings are passed to submit() as soon as it finishes;
+    titles already queued from another theater are skipped, unless the new
+    row has a director the queued one lacked. finish() waits for the
+    outstanding lookups, saves them, and attaches the results the same way
+    enrich_movies_with_letterboxd() does, so the build takes roughly the
+    longer of scraping and enrichment rather than their sum.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        # {title_key: director} for every title submitted
+        self._queued = {}
+        # {title_key: (title, year, director)} for titles not looked up yet
+        self._pending = {}
+        self._info = {}
+        self._thread = threading.Thread(target=self._run, name='letterboxd', daemon=True)
+        self._thread.start()
+
+    def submit(self, movies):
+        """Queue lookups for any titles in `movies` not already queued."""
+        for movie in movies:
+            key = title_key(movie)
+            director = movie.get('director')
+            if key in self._queued and (self._queued[key] or not director):
+                continue
+            self._queued[key] = director
+            lookup = (movie['title'], movie.get('year'), director)
+            with self._lock:
+                if key in self._pending:
+                    # Not looked up yet; the director helps tell remakes apart
+                    self._pending[key] = lookup
+                    continue
+                if key in self._info:
+                    continue
+                self._pending[key] = lookup
+            self._queue.put(key)
+
+    def _run(self):
+        while True:
+            key = self._queue.get()
+            if key is None:
+                return
+            with self._lock:
+                title, year, director = self._pending.pop(key)
+            try:
+                info = fetch_letterboxd_info(title, year, director)
+            except Exception as e:
+                logger.error(f"Letterboxd lookup failed for {title}: {e}")
+                continue
+            if info:
+                self._info[key] = info
+
+    def finish(self, movies):
+        """Wait for queued lookups, then add the results to `movies`.
+
+        Titles in `movies` that were never submitted (e.g. from theaters
+        kept from the last build) are looked up here too.
+        """
+        self.submit(movies)
+        logger.info(f"Waiting on Letterboxd lookups for {self._queue.qsize()} of {len(self._queued)} films...")
+        self._queue.put(None)
+        self._thread.join()
+        save_lookups()
+
+        if lookups_blocked():
+            logger.warning("Letterboxd lookups were cut short (host down or build deadline reached)")
+        logger.info(f"Found Letterboxd data for {len(self._info)} films")
+
+        return attach_info(movies, self._info)
+
+
+def prefetch_letterboxd(titles, delay=PREFETCH_DELAY):
+    """Look up (title, year, director) entries that aren't cached yet. Returns how many were found.
+
+    Titles already in the cache (including remembered misses) are skipped,
+    and each lookup is followed by `delay` seconds so an off-peak run stays
+    gentle. Stops early if Letterboxd goes down or the deadline passes.
+    """
+    cache = load_cache()
+    found = 0
+    try:
+        for title, year, director in titles:
+            if cache_key_for(title, year) in cache:
+                continue
+            if lookups_blocked():
+                logger.warning("Letterboxd prefetch cut short (host down or deadline reached)")
+                break
+            if fetch_letterboxd_info(title, year, director):
+                found += 1
+            time.sleep(delay)
+    finally:
+        save_lookups()
+    return found
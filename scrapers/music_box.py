@@ -1,6 +1,6 @@
 """Scraper for Music Box Theatre."""
 from bs4 import BeautifulSoup
-from .utils import make_request, parse_date, clean_text, logger
+from .utils import make_request, parse_cached, parse_date, clean_text, logger
 import re
 from datetime import datetime
 
@@ -14,16 +14,24 @@ THEATER_INFO = {
 
 def scrape_music_box():
     """Scrape Music Box Theatre schedule."""
-    movies = []
     base_url = 'https://musicboxtheatre.com'
+    calendar_url = f'{base_url}/calendar'
 
-    resp = make_request(f'{base_url}/calendar')
+    resp = make_request(calendar_url)
     if not resp:
         logger.error("Failed to fetch Music Box Theatre")
-        return movies
+        return []
+
+    movies = parse_cached(calendar_url, resp.text, parse_calendar_html, base_url, datetime.now().year)
+
+    logger.info(f"Music Box: Found {len(movies)} screenings")
+    return movies
+
 
-    soup = BeautifulSoup(resp.text, 'lxml')
-    current_year = datetime.now().year
+def parse_calendar_html(html, base_url, current_year):
+    """Extract screenings from the calendar page HTML."""
+    movies = []
+    soup = BeautifulSoup(html, 'lxml')
 
     # Find all showtime blocks
     showtime_blocks = soup.find_all(class_='programming-showtimes')
@@ -89,7 +97,6 @@ def scrape_music_box():
             'ticket_url': ticket_url
         })
 
-    logger.info(f"Music Box: Found {len(movies)} screenings")
     return movies
 
 
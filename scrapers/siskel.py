@@ -1,5 +1,8 @@
 """Scraper for Gene Siskel Film Center using Playwright."""
-from .utils import clean_text, logger
+from .browser import new_page
+from .utils import (
+    budget_timeout, clean_text, deadline_passed, horizon_dates, parse_many, record_fetch_failure, logger,
+)
 from datetime import datetime
 import re
 
@@ -11,41 +14,71 @@ THEATER_INFO = {
 
 
 def scrape_siskel():
-    """Scrape Gene Siskel Film Center schedule using Playwright."""
+    """Scrape Gene Siskel Film Center schedule using Playwright.
+
+    Starts from the current month's calendar and pages forward with its
+    "next month" link until the schedule horizon is covered.
+    """
     movies = []
+    calendar_url = f"{THEATER_INFO['url']}/playing-this-month"
+
+    # (year, month) pairs the horizon touches, in order
+    months = sorted({(int(d[:4]), int(d[5:7])) for d in horizon_dates()})
 
     try:
-        from playwright.sync_api import sync_playwright
+        import playwright.sync_api
     except ImportError:
         logger.warning("Playwright not installed - skipping Siskel")
+        record_fetch_failure()
         return movies
 
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
+    if deadline_passed():
+        logger.warning("Build deadline reached - skipping Siskel")
+        record_fetch_failure()
+        return movies
 
+    pages = []
+    try:
+        with new_page() as page:
             # Go to the calendar page
-            page.goto(f"{THEATER_INFO['url']}/playing-this-month", timeout=30000)
+            page.goto(calendar_url, timeout=budget_timeout(30) * 1000)
+
+            for i, month in enumerate(months):
+                if i > 0:
+                    next_link = page.locator('a', has_text=re.compile(r'next month', re.I)).first
+                    if deadline_passed() or not next_link.count():
+                        break
+                    next_link.click(timeout=budget_timeout(30) * 1000)
 
-            # Wait for content to load
-            page.wait_for_timeout(5000)
+                # Wait for content to load
+                page.wait_for_timeout(budget_timeout(5) * 1000)
 
-            # Get the page content
-            content = page.content()
-            browser.close()
+                # Get the page content
+                pages.append((month, page.content()))
 
     except Exception as e:
         logger.error(f"Playwright error for Siskel: {e}")
-        return movies
+        record_fetch_failure()
+        if not pages:
+            return movies
+
+    jobs = [(f"{calendar_url}#{year}-{month:02d}", content, parse_calendar_html, year, month)
+            for (year, month), content in pages]
+    for month_movies in parse_many(jobs):
+        movies.extend(month_movies)
+
+    logger.info(f"Gene Siskel: Found {len(movies)} screenings")
+    return movies
+
+
+def parse_calendar_html(content, current_year, current_month):
+    """Extract screenings from the rendered monthly calendar HTML."""
+    movies = []
 
     # Parse the rendered HTML
     from bs4 import BeautifulSoup
     soup = BeautifulSoup(content, 'lxml')
 
-    current_year = datetime.now().year
-    current_month = datetime.now().month
-
     # Find the calendar view
     calendar = soup.find(class_='view-monthly-calendar')
     if not calendar:
@@ -127,7 +160,6 @@ def scrape_siskel():
                 'ticket_url': ticket_url
             })
 
-    logger.info(f"Gene Siskel: Found {len(movies)} screenings")
     return movies
 
 
@@ -1,12 +1,82 @@
 """Shared utilities for scrapers."""
+import hashlib
+import inspect
+import json
+import os
+import random
 import re
+import sys
+import threading
+import time
 from datetime import datetime, timedelta
-from dateutil import parser as date_parser
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import urlparse
 import logging
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    from backports.zoneinfo import ZoneInfo
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CHICAGO_TZ = ZoneInfo('America/Chicago')
+
+# Default schedule horizon: this many days, starting today
+HORIZON_DAYS = 7
+_horizon_days = HORIZON_DAYS
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+# Retry backoff: full jitter over an exponentially growing window
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 10.0
+CONNECT_TIMEOUT = 10
+
+# Consecutive failed attempts before a host is skipped for the rest of the run
+BREAKER_THRESHOLD = 3
+
+# One requests.Session per thread, so connection pools stay warm across requests
+_sessions = threading.local()
+
+_breaker_lock = threading.Lock()
+_host_failures = {}
+_open_hosts = set()
+_deadline = None
+# Fetches skipped or given up on, so the build can tell a complete scrape from a partial one
+_fetch_failures = 0
+
+
+def _reset_breaker_lock():
+    global _breaker_lock
+    _breaker_lock = threading.Lock()
+
+
+# Background lookups may hold the lock when an isolated scraper is forked
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_breaker_lock)
+
+PARSE_CACHE_FILE = Path(__file__).parent.parent / 'data' / 'parse_cache.json'
+# Entries not seen for this many days are dropped when the cache is saved
+PARSE_CACHE_MAX_AGE_DAYS = 14
+
+_parse_cache_lock = threading.Lock()
+_parse_cache = None
+_parse_cache_touched = set()
+
+# Worker processes for parse_many(); None means one per CPU
+PARSE_WORKERS = None
+# Batches with fewer uncached pages than this are parsed in-process
+PARSE_POOL_MIN = 2
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
 
 def get_week_dates():
     """Get dates for the current week (Mon-Sun)."""
@@ -16,8 +86,34 @@ def get_week_dates():
     return [(monday + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(7)]
 
 
+def set_horizon(days):
+    """Set how many days, starting today, scrapers fetch and the site shows."""
+    global _horizon_days
+    if int(days) < 1:
+        raise ValueError(f"The schedule horizon must be at least 1 day, not {days}")
+    _horizon_days = int(days)
+
+
+def horizon_days():
+    """Number of days covered by the schedule, today included."""
+    return _horizon_days
+
+
+def horizon_end():
+    """The first date past the schedule: the window is today <= date < horizon_end(), in Chicago time."""
+    return datetime.now(CHICAGO_TZ).date() + timedelta(days=_horizon_days)
+
+
+def horizon_dates():
+    """The dates (YYYY-MM-DD) in the schedule window, starting today."""
+    end = horizon_end()
+    return [(end - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(_horizon_days, 0, -1)]
+
+
 def parse_date(date_str, year=None):
     """Parse various date formats into YYYY-MM-DD."""
+    from dateutil import parser as date_parser
+
     if not date_str:
         return None
     try:
@@ -48,28 +144,292 @@ def clean_text(text):
     return ' '.join(text.split())
 
 
-def make_request(url, session=None, timeout=30, retries=2):
-    """Make HTTP request with error handling and retries."""
+def set_deadline(seconds):
+    """Set the overall build deadline, `seconds` from now (None to clear)."""
+    global _deadline
+    _deadline = time.monotonic() + seconds if seconds else None
+
+
+def time_remaining():
+    """Seconds left before the build deadline, or None if there isn't one."""
+    if _deadline is None:
+        return None
+    return max(0.0, _deadline - time.monotonic())
+
+
+def deadline_passed():
+    """Whether the build deadline has been reached."""
+    remaining = time_remaining()
+    return remaining is not None and remaining <= 0
+
+
+def budget_timeout(timeout):
+    """Clamp a per-request timeout so it doesn't run past the build deadline."""
+    remaining = time_remaining()
+    if remaining is None:
+        return timeout
+    return max(0.1, min(timeout, remaining))
+
+
+def _host(url):
+    return urlparse(url).netloc.lower()
+
+
+def circuit_open(url):
+    """Whether requests to this URL's host are being skipped."""
+    with _breaker_lock:
+        return _host(url) in _open_hosts
+
+
+def record_success(url):
+    """Reset the failure count for this URL's host."""
+    with _breaker_lock:
+        _host_failures.pop(_host(url), None)
+
+
+def record_failure(url):
+    """Count a failed attempt against this URL's host, tripping the breaker if needed."""
+    host = _host(url)
+    with _breaker_lock:
+        _host_failures[host] = _host_failures.get(host, 0) + 1
+        if _host_failures[host] >= BREAKER_THRESHOLD and host not in _open_hosts:
+            _open_hosts.add(host)
+            logger.error(f"{host} failed {_host_failures[host]} times in a row - skipping it for the rest of the run")
+
+
+def record_fetch_failure():
+    """Count a page a scraper needed but couldn't get (request failed or was skipped)."""
+    global _fetch_failures
+    with _breaker_lock:
+        _fetch_failures += 1
+
+
+def fetch_failures():
+    """Fetches lost so far in this process (see record_fetch_failure)."""
+    return _fetch_failures
+
+
+def reset_circuits():
+    """Close every breaker (e.g. between runs of a long-lived process)."""
+    with _breaker_lock:
+        _host_failures.clear()
+        _open_hosts.clear()
+
+
+def backoff_delay(attempt):
+    """Seconds to wait before retry number `attempt` (0-based)."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def get_session():
+    """Return this thread's shared requests.Session."""
     import requests
-    import time
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-    }
+    session = getattr(_sessions, 'session', None)
+    if session is None:
+        session = _sessions.session = requests.Session()
+    return session
+
+
+def make_request(url, session=None, timeout=30, retries=2, headers=None, stream=False):
+    """Make HTTP request with retries, backoff and a per-host circuit breaker. Returns None on failure."""
+    import requests
+
+    if headers is None:
+        headers = DEFAULT_HEADERS
+    if session is None:
+        session = get_session()
 
     for attempt in range(retries + 1):
+        if circuit_open(url):
+            logger.warning(f"Skipping {url}: host circuit is open")
+            record_fetch_failure()
+            return None
+        if deadline_passed():
+            logger.warning(f"Skipping {url}: build deadline reached")
+            record_fetch_failure()
+            return None
+
+        read_timeout = budget_timeout(timeout)
+        request_timeout = (min(CONNECT_TIMEOUT, read_timeout), read_timeout)
         try:
-            if session:
-                resp = session.get(url, headers=headers, timeout=timeout)
-            else:
-                resp = requests.get(url, headers=headers, timeout=timeout)
+            resp = session.get(url, headers=headers, timeout=request_timeout, stream=stream)
             resp.raise_for_status()
+            record_success(url)
             return resp
         except requests.RequestException as e:
+            status = getattr(e.response, 'status_code', None)
+            if status is not None and status < 500 and status != 429:
+                # The host answered; a 4xx won't change on retry, but the page is still missing
+                record_success(url)
+                logger.error(f"Request failed for {url}: {e}")
+                record_fetch_failure()
+                return None
+            record_failure(url)
             if attempt < retries:
-                time.sleep(2)
+                delay = backoff_delay(attempt)
+                remaining = time_remaining()
+                if remaining is not None:
+                    delay = min(delay, remaining)
+                time.sleep(delay)
                 continue
             logger.error(f"Request failed for {url}: {e}")
+            record_fetch_failure()
             return None
+
+
+def _load_parse_cache():
+    global _parse_cache
+    if _parse_cache is None:
+        try:
+            with open(PARSE_CACHE_FILE) as f:
+                _parse_cache = json.load(f)
+        except (OSError, ValueError):
+            _parse_cache = {}
+    return _parse_cache
+
+
+def _hash_code(h, code):
+    """Feed a code object's bytecode and constants, nested functions included, into h."""
+    h.update(code.co_code)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            _hash_code(h, const)
+        else:
+            h.update(repr(const).encode())
+    h.update(repr(code.co_names).encode())
+
+
+@lru_cache(maxsize=None)
+def parser_fingerprint(parse):
+    """Hash of the parser's module and this module's source (or its bytecode), so cached parses expire on change."""
+    h = hashlib.sha256(f'{parse.__module__}.{parse.__qualname__}'.encode())
+    try:
+        for module in (sys.modules[parse.__module__], sys.modules[__name__]):
+            h.update(inspect.getsource(module).encode())
+    except (KeyError, OSError, TypeError):
+        _hash_code(h, parse.__code__)
+    return h.hexdigest()
+
+
+def _parse_digest(content, parse, args):
+    """Hash a page body together with the parser and its extra arguments."""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    h = hashlib.sha256(content)
+    h.update(parser_fingerprint(parse).encode())
+    h.update(repr(args).encode())
+    return h.hexdigest()
+
+
+def _cached_result(key, digest):
+    """Return the stored parse result for key if its digest matches, else None."""
+    today = datetime.now().strftime('%Y-%m-%d')
+    with _parse_cache_lock:
+        cache = _load_parse_cache()
+        entry = cache.get(key)
+        if entry and entry.get('hash') == digest:
+            if entry.get('seen') != today:
+                entry['seen'] = today
+                _parse_cache_touched.add(key)
+            # Round-trip through JSON so callers can mutate the rows freely
+            return json.loads(entry['result'])
+    return None
+
+
+def _store_result(key, digest, result):
+    today = datetime.now().strftime('%Y-%m-%d')
+    with _parse_cache_lock:
+        cache = _load_parse_cache()
+        cache[key] = {'hash': digest, 'seen': today, 'result': json.dumps(result)}
+        _parse_cache_touched.add(key)
+
+
+def parse_cached(key, content, parse, *args):
+    """Return parse(content, *args), reusing the result stored under key for a byte-identical page."""
+    digest = _parse_digest(content, parse, args)
+    result = _cached_result(key, digest)
+    if result is not None:
+        return result
+
+    result = parse(content, *args)
+    _store_result(key, digest, result)
+    return result
+
+
+def get_parse_pool():
+    """Return the process pool used by parse_many(), starting it if needed."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS or os.cpu_count() or 1)
+        return _parse_pool
+
+
+def shutdown_parse_pool():
+    """Stop the parse worker processes."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(cancel_futures=True)
+            _parse_pool = None
+
+
+def parse_many(jobs):
+    """Like parse_cached() for a batch of (key, content, parse, *args) jobs, parsing misses in worker processes."""
+    results = [None] * len(jobs)
+    misses = []
+    for i, (key, content, parse, *args) in enumerate(jobs):
+        digest = _parse_digest(content, parse, args)
+        results[i] = _cached_result(key, digest)
+        if results[i] is None:
+            misses.append((i, key, digest, content, parse, args))
+
+    parsed = None
+    workers = PARSE_WORKERS or os.cpu_count() or 1
+    if len(misses) >= PARSE_POOL_MIN and workers > 1:
+        from concurrent.futures.process import BrokenProcessPool
+        from pickle import PicklingError
+        try:
+            pool = get_parse_pool()
+            futures = [pool.submit(parse, content, *args) for _, _, _, content, parse, args in misses]
+            parsed = [future.result() for future in futures]
+        except (BrokenProcessPool, PicklingError, OSError) as e:
+            logger.warning(f"Parse pool unavailable ({e}); parsing in-process")
+            shutdown_parse_pool()
+    if parsed is None:
+        parsed = [parse(content, *args) for _, _, _, content, parse, args in misses]
+
+    for (i, key, digest, _, _, _), result in zip(misses, parsed):
+        _store_result(key, digest, result)
+        results[i] = result
+    return results
+
+
+def save_parse_cache():
+    """Merge this process's parse cache entries into the file, dropping ones not seen lately."""
+    with _parse_cache_lock:
+        if not _parse_cache_touched:
+            return
+        try:
+            with open(PARSE_CACHE_FILE) as f:
+                merged = json.load(f)
+        except (OSError, ValueError):
+            merged = {}
+        merged.update({key: _parse_cache[key] for key in _parse_cache_touched})
+
+        cutoff = (datetime.now() - timedelta(days=PARSE_CACHE_MAX_AGE_DAYS)).strftime('%Y-%m-%d')
+        merged = {k: v for k, v in merged.items() if v.get('seen', '') >= cutoff}
+        write_json_atomic(PARSE_CACHE_FILE, merged)
+        _parse_cache_touched.clear()
+
+
+def write_json_atomic(path, data, **kwargs):
+    """Write JSON via a temp file and rename, so readers never see a partial file."""
+    path = Path(path)
+    path.parent.mkdir(exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    with open(tmp, 'w') as f:
+        f.write(json.dumps(data, **kwargs))
+    os.replace(tmp, path)
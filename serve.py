@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Template development server with live re-rendering.
+
+Loads data/movies.json once and keeps the screenings and the compiled Jinja
+environment in memory. Whenever a template changes, the front page is
+re-rendered from memory into .serve/ (no scraping, fragment cache,
+fingerprinting or compression, so site/ and data/ are left alone) and open
+browser tabs reload themselves; a change to site/styles.css just reloads
+them. Everything else is served from site/. Example:
+
+    python serve.py
+    open http://127.0.0.1:8000/
+"""
+import argparse
+import sys
+import threading
+import time
+import traceback
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from build import (
+    BASE_DIR, DEFAULT_MARKET, MARKET_KEYS, TEMPLATE_DIR, filter_to_week, load_data, market_dirs,
+    render_index, template_env,
+)
+
+DEFAULT_PORT = 8000
+
+# Rendered pages go here, shadowing their counterparts in site/
+DEV_DIR = BASE_DIR / '.serve'
+
+# How often to check the templates and stylesheet for changes, in seconds
+WATCH_INTERVAL = 0.05
+
+# Seconds between keep-alive comments on the reload stream
+PING_INTERVAL = 15
+
+RELOAD_PATH = '/__reload'
+
+# Appended to every HTML page served, never written to disk
+RELOAD_SCRIPT = (
+    f"<script>new EventSource('{RELOAD_PATH}').onmessage = function () {{ location.reload(); }};</script>\n"
+).encode('utf-8')
+
+_version = 0
+_changed = threading.Condition()
+
+
+def watched_files(template_dir, site_dir):
+    """The files whose changes trigger a re-render."""
+    return sorted(Path(template_dir).glob('*.html')) + [Path(site_dir) / 'styles.css']
+
+
+def snapshot(paths):
+    """Return {path: mtime} for the paths that exist."""
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = path.stat().st_mtime_ns
+        except OSError:
+            pass
+    return mtimes
+
+
+def bump_version():
+    """Tell every waiting browser tab to reload."""
+    global _version
+    with _changed:
+        _version += 1
+        _changed.notify_all()
+
+
+class Handler(SimpleHTTPRequestHandler):
+    """Serves DEV_DIR over the site directory, with a reload stream injected into HTML pages."""
+
+    def translate_path(self, path):
+        site_path = super().translate_path(path)
+        dev_path = DEV_DIR / Path(site_path).relative_to(self.directory)
+        if dev_path.is_file() or (dev_path / 'index.html').is_file():
+            return str(dev_path)
+        return site_path
+
+    def do_GET(self):
+        if self.path.split('?')[0] == RELOAD_PATH:
+            self.stream_reloads()
+            return
+        super().do_GET()
+
+    def send_head(self):
+        path = Path(self.translate_path(self.path))
+        if path.is_dir() and self.path.split('?')[0].endswith('/'):
+            path = path / 'index.html'
+        if path.suffix != '.html' or not path.is_file():
+            return super().send_head()
+
+        body = path.read_bytes()
+        marker = body.rfind(b'</body>')
+        body = body[:marker] + RELOAD_SCRIPT + body[marker:] if marker >= 0 else body + RELOAD_SCRIPT
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        if self.command == 'HEAD':
+            return None
+        self.wfile.write(body)
+        return None
+
+    def stream_reloads(self):
+        """Hold the connection open as an event stream, sending an event per re-render."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        with _changed:
+            seen = _version
+        try:
+            while True:
+                with _changed:
+                    _changed.wait_for(lambda: _version != seen, timeout=PING_INTERVAL)
+                    current = _version
+                if current != seen:
+                    self.wfile.write(f"data: {current}\n\n".encode('utf-8'))
+                    seen = current
+                else:
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def render(movies, env, output_path, root):
+    """Re-render the front page from memory. Returns the time taken in milliseconds."""
+    started = time.perf_counter()
+    render_index(movies, env, output_path, root)
+    return (time.perf_counter() - started) * 1000
+
+
+def watch(movies, env, site_dir, output_path, root, interval=WATCH_INTERVAL):
+    """Poll the templates and stylesheet, reloading on every change.
+
+    Only template changes need a re-render; the stylesheet is served as is.
+    """
+    paths = watched_files(TEMPLATE_DIR, site_dir)
+    mtimes = snapshot(paths)
+    while True:
+        time.sleep(interval)
+        # Pick up templates added since the last check
+        paths = watched_files(TEMPLATE_DIR, site_dir)
+        current = snapshot(paths)
+        if current == mtimes:
+            continue
+        changed = sorted(p.name for p in current.keys() | mtimes.keys() if current.get(p) != mtimes.get(p))
+        mtimes = current
+        if any(name.endswith('.html') for name in changed):
+            try:
+                elapsed = render(movies, env, output_path, root)
+            except Exception:
+                # A half-edited template; keep serving the last good render
+                traceback.print_exc()
+                continue
+            print(f"Re-rendered in {elapsed:.0f} ms ({', '.join(changed)})")
+        else:
+            print(f"Reloading ({', '.join(changed)})")
+        bump_version()
+
+
+def main(argv=None):
+    """Load the data, render once, then serve and watch."""
+    parser = argparse.ArgumentParser(description='Serve the site locally, re-rendering on template changes.')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--market', choices=MARKET_KEYS, default=DEFAULT_MARKET,
+                        help=f'market whose data to render (default: {DEFAULT_MARKET})')
+    args = parser.parse_args(argv)
+
+    data_dir, site_dir = market_dirs(args.market)
+    output_path = DEV_DIR / site_dir.relative_to(BASE_DIR / 'site') / 'index.html'
+    root = '' if args.market == DEFAULT_MARKET else '../'
+
+    movies = filter_to_week(load_data(data_dir / 'movies.json'))
+    print(f"Loaded {len(movies)} screenings from {data_dir / 'movies.json'}")
+    env = template_env(TEMPLATE_DIR)
+    print(f"Rendered {output_path} in {render(movies, env, output_path, root):.0f} ms")
+
+    threading.Thread(target=watch, args=(movies, env, site_dir, output_path, root), daemon=True).start()
+
+    # Serve the whole site so market pages can reach the shared assets
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), partial(Handler, directory=str(BASE_DIR / 'site')))
+    page = '' if args.market == DEFAULT_MARKET else f'{args.market}/'
+    print(f"Serving on http://127.0.0.1:{args.port}/{page} (watching templates/ and styles.css)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
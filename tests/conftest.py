@@ -0,0 +1,55 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scrapers.utils import CHICAGO_TZ
+
+
+def day(offset=0):
+    """A YYYY-MM-DD date `offset` days from today, in Chicago time."""
+    return (datetime.now(CHICAGO_TZ).date() + timedelta(days=offset)).strftime('%Y-%m-%d')
+
+
+def screening(title='Chungking Express', theater='Music Box Theatre', date=None, times=('7:00 PM',),
+              **extra):
+    """A scraped screening row; keyword arguments add or override fields."""
+    return {'title': title, 'theater': theater, 'date': date or day(), 'times': list(times),
+            'year': 1994, 'format': '35mm', 'ticket_url': 'https://example.com/tickets', **extra}
+
+
+@pytest.fixture(autouse=True)
+def closed_circuits():
+    """Every test starts with no host failures recorded."""
+    from scrapers.utils import reset_circuits
+
+    reset_circuits()
+    yield
+    reset_circuits()
+
+
+def reset_lookup_state(monkeypatch):
+    """Forget the in-memory Letterboxd cache and film catalog, as a fresh process would start."""
+    from scrapers import catalog, letterboxd
+
+    monkeypatch.setattr(letterboxd, '_cache', None)
+    monkeypatch.setattr(letterboxd, '_new_entries', {})
+    monkeypatch.setattr(letterboxd, '_hold_writes', False)
+    monkeypatch.setattr(catalog, '_films', None)
+    monkeypatch.setattr(catalog, '_by_title', None)
+    monkeypatch.setattr(catalog, '_by_word', None)
+    monkeypatch.setattr(catalog, '_changed', set())
+    monkeypatch.setattr(catalog, '_hold_writes', False)
+
+
+@pytest.fixture
+def empty_stores(tmp_path, monkeypatch):
+    """An empty Letterboxd cache and film catalog, saved under tmp_path."""
+    from scrapers import catalog, letterboxd
+
+    monkeypatch.setattr(letterboxd, 'CACHE_FILE', tmp_path / 'letterboxd_cache.json')
+    monkeypatch.setattr(catalog, 'CATALOG_FILE', tmp_path / 'film_catalog.json')
+    reset_lookup_state(monkeypatch)
@@ -0,0 +1,82 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import api
+from conftest import day, screening
+
+
+@pytest.fixture
+def index():
+    return api.build_index([
+        screening(),
+        screening('Fallen Angels', theater='Facets', times=('9:30 PM',)),
+        screening('Chungking Express', date=day(1), times=('4:00 PM', '9:00 PM')),
+        screening('The Grandmaster', theater='Facets', date=day(1)),
+    ])
+
+
+@pytest.fixture
+def server(index, monkeypatch):
+    """Serve `index` on a free local port and return its base URL."""
+    monkeypatch.setattr(api, '_index', index)
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), api.Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def titles(results):
+    return [(m['title'], m['date']) for m in results]
+
+
+def test_filters_by_date(index):
+    assert titles(api.query_screenings(index, date=day(1))) == [
+        ('Chungking Express', day(1)), ('The Grandmaster', day(1))]
+
+
+def test_filters_by_theater_ignoring_case(index):
+    assert titles(api.query_screenings(index, theater='facets')) == [
+        ('Fallen Angels', day(0)), ('The Grandmaster', day(1))]
+    assert titles(api.query_screenings(index, theater='facets', date=day(0))) == [('Fallen Angels', day(0))]
+
+
+def test_filters_by_title_prefix(index):
+    assert titles(api.query_screenings(index, q='chung')) == [
+        ('Chungking Express', day(0)), ('Chungking Express', day(1))]
+    assert titles(api.query_screenings(index, q='the gr')) == [('The Grandmaster', day(1))]
+    assert api.query_screenings(index, q='express angels') == []
+
+
+def test_showtime_range_narrows_the_times(index):
+    results = api.query_screenings(index, date=day(1), after='8:00pm')
+    assert [(m['title'], m['times']) for m in results] == [('Chungking Express', ['9:00 PM'])]
+
+
+def test_screenings_endpoint_applies_the_query(server):
+    status, body = get(f'{server}/screenings?date={day(1)}&q=grand')
+    assert status == 200
+    assert body['count'] == 1 and body['screenings'][0]['title'] == 'The Grandmaster'
+
+
+def test_malformed_query_is_a_400(server):
+    status, body = get(f'{server}/screenings?after=late')
+    assert status == 400
+    assert 'after/before' in body['error']
+
+    # Stray separators and unknown keys are ignored rather than failing
+    status, body = get(f'{server}/screenings?&&theater&bogus=1&date={day(0)}')
+    assert status == 200 and body['count'] == 2
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from scrapers import catalog
+
+pytestmark = pytest.mark.usefixtures('empty_stores')
+
+
+def test_normalize_title():
+    assert catalog.normalize_title('The Godfather (35mm)') == 'godfather'
+    assert catalog.normalize_title('Amélie') == 'amelie'
+    assert catalog.normalize_title('Kill Bill: Vol. 2') == 'kill bill vol 2'
+
+
+def test_title_numbers():
+    assert catalog.title_numbers('kill bill vol 2') == [2]
+    assert catalog.title_numbers('godfather part ii') == [2]
+    assert catalog.title_numbers('before sunrise') == []
+    # A lone "i" is only a numeral after a numbering word
+    assert catalog.title_numbers('i robot') == []
+    assert catalog.title_numbers('dune part i') == [1]
+
+
+@pytest.mark.parametrize('year, director', [(2004, 'Quentin Tarantino'), (2004, None), (None, None)])
+def test_sequel_does_not_match_earlier_volume(year, director):
+    catalog.add_film('kill-bill-vol-1', 'Kill Bill: Vol. 1', 2003, 'Quentin Tarantino')
+    assert catalog.match_film('Kill Bill: Vol. 2', year, director) is None
+
+
+def test_numbered_sequels_match_their_own_entry():
+    catalog.add_film('kill-bill-vol-1', 'Kill Bill: Vol. 1', 2003, 'Quentin Tarantino')
+    catalog.add_film('kill-bill-vol-2', 'Kill Bill: Vol. 2', 2004, 'Quentin Tarantino')
+    catalog.add_film('the-godfather', 'The Godfather', 1972, 'Francis Ford Coppola')
+    catalog.add_film('the-godfather-part-ii', 'The Godfather Part II', 1974, 'Francis Ford Coppola')
+    catalog.add_film('toy-story-2', 'Toy Story 2', 1999)
+    catalog.add_film('toy-story-3', 'Toy Story 3', 2010)
+
+    assert catalog.match_film('Kill Bill: Vol. 2', 2004) == 'kill-bill-vol-2'
+    assert catalog.match_film('KILL BILL VOL. 1') == 'kill-bill-vol-1'
+    assert catalog.match_film('The Godfather: Part 2', 1974) == 'the-godfather-part-ii'
+    assert catalog.match_film('The Godfather', 1972) == 'the-godfather'
+    assert catalog.match_film('Toy Story 3', 2010) == 'toy-story-3'
+    assert catalog.match_film('Toy Story 4', 2019) is None
+
+
+def test_year_must_match_exactly():
+    catalog.add_film('suspiria', 'Suspiria', 1977, 'Dario Argento')
+    assert catalog.match_film('Suspiria', 1977) == 'suspiria'
+    assert catalog.match_film('Suspiria', 1978) is None
+    assert catalog.match_film('Suspiria', 2018) is None
+
+
+def test_remakes_separated_by_year_or_director():
+    catalog.add_film('suspiria', 'Suspiria', 1977, 'Dario Argento')
+    catalog.add_film('suspiria-2018', 'Suspiria', 2018, 'Luca Guadagnino')
+    assert catalog.match_film('Suspiria', 2018) == 'suspiria-2018'
+    assert catalog.match_film('Suspiria', director='Dario Argento') == 'suspiria'
+    # Ambiguous without either
+    assert catalog.match_film('Suspiria') is None
+
+
+def test_only_near_certain_matches_score_as_variants():
+    catalog.add_film('in-the-mood-for-love', 'In the Mood for Love', 2000, 'Wong Kar-wai')
+    slug, score = catalog.best_match('In the Mood for Love (35mm)', 2000)
+    assert slug == 'in-the-mood-for-love' and score >= catalog.VARIANT_THRESHOLD
+    slug, score = catalog.best_match('In the Mood of Love')
+    assert slug == 'in-the-mood-for-love' and score < catalog.VARIANT_THRESHOLD
+
+
+def test_catalog_round_trip():
+    catalog.add_film('paris-texas', 'Paris, Texas', 1984, 'Wim Wenders', variants=['Paris Texas', 'Paris, Tejas'])
+    catalog.save_catalog()
+    catalog._films = None
+    assert catalog.get_film('paris-texas')['variants'] == ['Paris, Tejas']
+
+
+def test_import_json_dump_with_a_list_of_directors(tmp_path):
+    dump = tmp_path / 'films.json'
+    dump.write_text(json.dumps([
+        {'slug': 'fargo', 'name': 'Fargo', 'year': 1996, 'directors': ['Joel Coen', 'Ethan Coen']},
+        {'letterboxd_uri': 'https://letterboxd.com/film/stalker/', 'title': 'Stalker', 'directors': []},
+    ]))
+    assert catalog.import_dump(dump) == 2
+
+    assert catalog.get_film('fargo')['director'] == 'Joel Coen, Ethan Coen'
+    assert 'director' not in catalog.get_film('stalker')
+    assert catalog.match_film('Fargo', 1996, 'Ethan Coen') == 'fargo'
@@ -0,0 +1,211 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+
+import build
+from conftest import day, screening
+from scrapers import utils
+
+
+def test_screening_id_ignores_times_but_not_format():
+    a = screening()
+    assert build.screening_id(a) == build.screening_id(screening(times=['9:00 PM']))
+    assert build.screening_id(a) != build.screening_id(screening(format='DCP'))
+    assert build.screening_id(a) != build.screening_id(screening(date=day(1)))
+
+
+def test_diff_reports_added_removed_and_retimed():
+    kept, retimed, removed = screening('Kept'), screening('Retimed'), screening('Removed')
+    added = screening('Added')
+    changes = build.diff_screenings([kept, retimed, removed],
+                                    [kept, dict(retimed, times=['9:30 PM']), added])
+
+    assert [s['title'] for s in changes['added']] == ['Added']
+    assert changes['added'][0]['times'] == ['7:00 PM']
+    assert [s['title'] for s in changes['removed']] == ['Removed']
+    assert changes['retimed'] == [{'id': build.screening_id(retimed), 'title': 'Retimed',
+                                   'theater': 'Music Box Theatre', 'date': day(),
+                                   'times': ['9:30 PM'], 'was': ['7:00 PM']}]
+
+
+def test_diff_ignores_time_order_and_other_fields():
+    before = screening(times=['7:00 PM', '9:30 PM'])
+    after = dict(before, times=['9:30 PM', '7:00 PM'], letterboxd={'rating': '4.1'})
+    assert build.diff_screenings([before], [after]) == {'added': [], 'removed': [], 'retimed': []}
+
+
+def test_rows_sharing_an_id_merge_their_times():
+    rows = [screening(times=['7:00 PM']), screening(times=['9:30 PM', '7:00 PM'])]
+    [merged] = build.index_screenings(rows).values()
+    assert merged['times'] == ['7:00 PM', '9:30 PM']
+
+
+def test_merge_keeps_theaters_not_fully_scraped():
+    previous = [screening('Old A', 'Facets'), screening('Old B', 'Logan Theatre'),
+                screening('Retimed', 'Logan Theatre')]
+    fresh = [screening('New', 'Logan Theatre'), screening('Retimed', 'Logan Theatre', times=['10:00 PM'])]
+
+    # Logan completed, so its old rows go; Facets wasn't scraped, so its rows stay
+    merged = build.merge_with_previous(fresh, {'Logan Theatre'}, previous)
+    assert sorted(m['title'] for m in merged) == ['New', 'Old A', 'Retimed']
+
+    # A partial Logan scrape keeps its old rows, with fresh versions replacing saved ones
+    merged = build.merge_with_previous(fresh, set(), previous)
+    assert sorted(m['title'] for m in merged) == ['New', 'Old A', 'Old B', 'Retimed']
+    assert [m['times'] for m in merged if m['title'] == 'Retimed'] == [['10:00 PM']]
+
+
+class NotFoundSession:
+    """A session whose every request comes back 404."""
+
+    def get(self, url, **kwargs):
+        response = requests.Response()
+        response.status_code = 404
+        response.url = url
+        return response
+
+
+def test_a_404_keeps_the_theaters_saved_rows(monkeypatch):
+    monkeypatch.setattr(utils, 'get_session', NotFoundSession)
+    previous = [screening('Old A', 'Facets')]
+
+    movies, scraped = build.run_scrapers(['facets'])
+    assert movies == [] and scraped == set()
+    assert build.merge_with_previous(movies, scraped, previous) == previous
+
+
+def fake_scrapers(monkeypatch, scrapers):
+    def load(key):
+        name, rows, lost = scrapers[key]
+
+        def scrape():
+            for _ in range(lost):
+                utils.record_fetch_failure()
+            return rows
+        return scrape, {'name': name}
+    monkeypatch.setattr(build, 'load_scraper', load)
+    monkeypatch.setattr(build, 'save_parse_cache', lambda: None)
+
+
+def test_partial_scrape_is_not_counted_as_scraped(monkeypatch):
+    fake_scrapers(monkeypatch, {
+        'ok': ('Facets', [screening(theater='Facets')], 0),
+        'flaky': ('Logan Theatre', [screening(theater='Logan Theatre')], 2),
+        'offline': ('Music Box Theatre', [], 3),
+    })
+    movies, scraped = build.run_scrapers(['ok', 'flaky', 'offline'])
+    assert scraped == {'Facets'}
+    assert len(movies) == 2
+
+
+@pytest.fixture
+def market(tmp_path):
+    data_dir, site_dir = tmp_path / 'data', tmp_path / 'site'
+    data_dir.mkdir()
+    site_dir.mkdir()
+    return data_dir, site_dir
+
+
+def read_feed(data_dir):
+    return json.loads((data_dir / build.CHANGES_NAME).read_text())
+
+
+def change_sets(data_dir):
+    """Change sets recorded so far (none if the feed hasn't been written)."""
+    path = data_dir / build.CHANGES_NAME
+    return json.loads(path.read_text())['changes'] if path.exists() else []
+
+
+def save_build(movies, data_dir, site_dir):
+    """Record, save and publish a build the way build_market does."""
+    cursor = build.update_changes_feed(movies, data_dir)
+    build.save_data(movies, data_dir / 'movies.json', cursor)
+    build.publish_data(data_dir, site_dir)
+    return cursor
+
+
+def test_offline_build_publishes_no_changes(monkeypatch, market):
+    data_dir, site_dir = market
+    save_build([screening('A'), screening('B', 'Facets')], data_dir, site_dir)
+
+    # Every scraper loses its fetches, as when the network is down
+    fake_scrapers(monkeypatch, {'music_box': ('Music Box Theatre', [], 1), 'facets': ('Facets', [], 1)})
+    monkeypatch.setattr(build, 'market_dirs', lambda market: (data_dir, site_dir))
+    monkeypatch.setattr(build, 'select_scrapers', lambda *a: ['music_box', 'facets'])
+    monkeypatch.setattr(build, 'generate_html', lambda *a, **k: None)
+
+    args = build.parse_args(['--no-enrich'])
+    build.build_market(build.DEFAULT_MARKET, args)
+    assert change_sets(data_dir) == []
+    assert len(build.load_data(data_dir / 'movies.json')) == 2
+
+
+def test_sample_fallback_is_not_saved_or_diffed(monkeypatch, market):
+    data_dir, site_dir = market
+    previous = [screening('Past', date=day(-3))]
+    build.save_data(previous, data_dir / 'movies.json')
+
+    fake_scrapers(monkeypatch, {'music_box': ('Music Box Theatre', [], 0)})
+    monkeypatch.setattr(build, 'market_dirs', lambda market: (data_dir, site_dir))
+    monkeypatch.setattr(build, 'select_scrapers', lambda *a: ['music_box'])
+    monkeypatch.setattr(build, 'generate_html', lambda *a, **k: None)
+
+    build.build_market(build.DEFAULT_MARKET, build.parse_args(['--no-enrich']))
+    assert not (data_dir / build.CHANGES_NAME).exists()
+    assert [m['title'] for m in build.load_data(data_dir / 'movies.json')] == ['Past']
+
+
+def test_feed_sequence(market):
+    data_dir, site_dir = market
+    first = save_build([screening('A'), screening('B')], data_dir, site_dir)
+    assert first['seq'] == 0
+    assert change_sets(data_dir) == []
+
+    second = save_build([screening('A', times=['8:00 PM']), screening('C')], data_dir, site_dir)
+    # Nothing changed: no new change set
+    third = save_build([screening('A', times=['8:00 PM']), screening('C')], data_dir, site_dir)
+    assert second == third == {'epoch': first['epoch'], 'seq': 1}
+
+    [change_set] = change_sets(data_dir)
+    assert change_set['seq'] == 1
+    assert [s['title'] for s in change_set['added']] == ['C']
+    assert [s['title'] for s in change_set['removed']] == ['B']
+    assert [s['title'] for s in change_set['retimed']] == ['A']
+
+
+def test_published_snapshot_carries_cursor(market):
+    data_dir, site_dir = market
+    save_build([screening('A')], data_dir, site_dir)
+    cursor = save_build([screening('B')], data_dir, site_dir)
+
+    snapshot = json.loads((site_dir / 'movies.json').read_text())
+    assert {'epoch': snapshot['epoch'], 'seq': snapshot['seq']} == cursor
+    assert [m['title'] for m in build.load_data(site_dir / 'movies.json')] == ['B']
+    assert json.loads((site_dir / build.CHANGES_NAME).read_text()) == read_feed(data_dir)
+
+
+def test_lost_feed_starts_a_new_epoch(market, monkeypatch):
+    data_dir, site_dir = market
+    first = save_build([screening('A')], data_dir, site_dir)
+    save_build([screening('B')], data_dir, site_dir)
+    (data_dir / build.CHANGES_NAME).unlink()
+
+    class Later(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz) + timedelta(seconds=5)
+    monkeypatch.setattr(build, 'datetime', Later)
+
+    cursor = save_build([screening('C')], data_dir, site_dir)
+    assert cursor['epoch'] != first['epoch']
+    assert cursor['seq'] == 0
+    assert change_sets(data_dir) == []
+
+
+def test_passed_screenings_are_not_removals(market):
+    data_dir, site_dir = market
+    save_build([screening('Yesterday', date=day(-1)), screening('Today')], data_dir, site_dir)
+    save_build([screening('Today')], data_dir, site_dir)
+    assert change_sets(data_dir) == []
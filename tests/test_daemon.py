@@ -0,0 +1,52 @@
+import pytest
+
+import build
+from conftest import day, screening
+
+
+@pytest.fixture
+def one_pass(tmp_path, monkeypatch):
+    """Run a single daemon pass per market against temp directories, with a fake scraper."""
+    dirs = {}
+
+    def fake_dirs(market):
+        return dirs.setdefault(market, (tmp_path / 'data' / market, tmp_path / 'site' / market))
+
+    def fake_scrape(keys):
+        for key in keys:
+            yield key, [screening(), screening('Fallen Angels', date=day(60))], 0
+
+    def stop(seconds):
+        raise KeyboardInterrupt
+
+    rendered = []
+
+    def fake_render(movies, template_dir, output_path, *args):
+        rendered.append((output_path, [m['title'] for m in movies]))
+
+    monkeypatch.setattr(build, 'market_dirs', fake_dirs)
+    monkeypatch.setattr(build, 'market_scrapers', lambda market: [f'{market}_theater'])
+    monkeypatch.setattr(build, 'run_in_process', fake_scrape)
+    monkeypatch.setattr(build, 'generate_html', fake_render)
+    monkeypatch.setattr(build.time, 'sleep', stop)
+
+    def run(markets):
+        build.run_daemon(build.parse_args(['--daemon', '--no-enrich']), markets)
+        return dirs, rendered
+    return run
+
+
+def test_daemon_refreshes_every_market(one_pass):
+    dirs, rendered = one_pass(['chicago', 'milwaukee'])
+
+    assert sorted(path.parent.name for path, _ in rendered) == ['chicago', 'milwaukee']
+    assert all(titles == ['Chungking Express'] for _, titles in rendered)
+    for data_dir, _ in dirs.values():
+        assert [m['title'] for m in build.load_data(data_dir / 'movies.json')] == ['Chungking Express']
+
+
+def test_daemon_records_upcoming_titles(one_pass):
+    dirs, _ = one_pass(['chicago'])
+
+    upcoming = build.load_upcoming(dirs['chicago'][0] / 'upcoming.json')
+    assert [entry['title'] for entry in upcoming.values()] == ['Fallen Angels']
@@ -0,0 +1,15 @@
+import scrapers
+
+
+def test_scrapers_are_marked_by_theater_info(tmp_path):
+    (tmp_path / 'new_theater.py').write_text("THEATER_INFO = {'name': 'New Theater'}\n")
+    (tmp_path / 'helpers.py').write_text("# mentions THEATER_INFO = but only in a comment\nDEFAULTS = {}\n")
+    assert scrapers.is_scraper_module(tmp_path / 'new_theater.py')
+    assert not scrapers.is_scraper_module(tmp_path / 'helpers.py')
+    assert not scrapers.is_scraper_module(tmp_path / 'missing.py')
+
+
+def test_discovery_skips_helpers():
+    keys = scrapers.available_scrapers()
+    assert keys[:len(scrapers.SCRAPER_ORDER)] == scrapers.SCRAPER_ORDER
+    assert not {'utils', 'letterboxd', 'browser', 'catalog'} & set(keys)
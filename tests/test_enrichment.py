@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from scrapers import letterboxd
+
+pytestmark = pytest.mark.usefixtures('empty_stores')
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Record fetch_letterboxd_info calls; only titles with a director are found."""
+    calls = []
+
+    def fake_fetch(title, year=None, director=None):
+        calls.append((title, director))
+        return {'title': title, 'director': director} if director else None
+
+    monkeypatch.setattr(letterboxd, 'fetch_letterboxd_info', fake_fetch)
+    return calls
+
+
+def row(title, director=None, theater='Music Box Theatre'):
+    return {'title': title, 'year': 1977, 'director': director, 'theater': theater}
+
+
+def test_pipeline_prefers_the_row_with_a_director(lookups):
+    pipeline = letterboxd.EnrichmentPipeline()
+    pipeline.submit([row('Suspiria')])
+    pipeline.submit([row('Suspiria', 'Dario Argento', 'Gene Siskel Film Center')])
+    movies = pipeline.finish([row('Suspiria')])
+
+    assert lookups[-1] == ('Suspiria', 'Dario Argento')
+    assert movies[0]['letterboxd']['director'] == 'Dario Argento'
+
+
+def test_pipeline_looks_each_title_up_once(lookups):
+    pipeline = letterboxd.EnrichmentPipeline()
+    pipeline.submit([row('Stalker', 'Andrei Tarkovsky')])
+    pipeline.submit([row('Stalker'), row('Stalker', 'Andrei Tarkovsky')])
+    pipeline.finish([])
+
+    assert lookups == [('Stalker', 'Andrei Tarkovsky')]
+
+
+def test_lookups_are_written_once_at_the_end():
+    letterboxd.store_result('Stalker|1979', None)
+    letterboxd.store_result('Suspiria|1977', None)
+    assert not letterboxd.CACHE_FILE.exists()
+
+    letterboxd.save_lookups()
+    assert json.loads(letterboxd.CACHE_FILE.read_text()) == {'Stalker|1979': None, 'Suspiria|1977': None}
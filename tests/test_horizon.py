@@ -0,0 +1,37 @@
+from datetime import datetime
+
+import pytest
+
+import build
+from conftest import screening
+from scrapers import utils
+
+
+@pytest.fixture(autouse=True)
+def default_horizon():
+    yield
+    utils.set_horizon(utils.HORIZON_DAYS)
+
+
+@pytest.mark.parametrize('days', [1, 7, 30])
+def test_every_stage_uses_the_same_window(days, tmp_path):
+    utils.set_horizon(days)
+    dates = utils.horizon_dates()
+    end = utils.horizon_end().strftime('%Y-%m-%d')
+    today = datetime.now(build.CHICAGO_TZ).date()
+
+    assert len(dates) == days and dates[-1] < end
+    assert [m['date'] for m in build.filter_to_week([screening(date=d) for d in dates + [end]])] == dates
+
+    build.save_upcoming([screening(date=d) for d in dates + [end]], tmp_path / 'upcoming.json')
+    assert [e['date'] for e in build.load_upcoming(tmp_path / 'upcoming.json').values()] == [end]
+
+    pages = build.paginate({d: [screening(date=d)] for d in dates}, today)
+    assert list(pages[0]) == dates[:build.PAGE_DAYS]
+
+
+def test_days_must_be_positive():
+    with pytest.raises(SystemExit):
+        build.parse_args(['--days', '0'])
+    with pytest.raises(ValueError):
+        utils.set_horizon(0)
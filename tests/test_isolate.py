@@ -0,0 +1,65 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import build
+
+pytestmark = pytest.mark.skipif(not Path('/proc').is_dir(), reason='needs /proc')
+
+
+def spawn_browser_like(pid_file):
+    """Start a grandchild in its own session, as Playwright does with Chromium, then hang."""
+    os.setsid()
+    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'], start_new_session=True)
+    Path(pid_file).write_text(str(child.pid))
+    time.sleep(60)
+
+
+def alive(pid):
+    try:
+        state = Path(f'/proc/{pid}/stat').read_text().rsplit(')', 1)[1].split()[0]
+    except OSError:
+        return False
+    return state != 'Z'
+
+
+@pytest.fixture
+def scraper_process(tmp_path):
+    pid_file = tmp_path / 'grandchild.pid'
+    process = multiprocessing.Process(target=spawn_browser_like, args=(str(pid_file),))
+    process.start()
+    for _ in range(100):
+        if pid_file.exists() and pid_file.read_text():
+            break
+        time.sleep(0.05)
+    grandchild = int(pid_file.read_text())
+    yield process, grandchild
+    for pid in (process.pid, grandchild):
+        try:
+            os.kill(pid, 9)
+        except OSError:
+            pass
+    process.join()
+
+
+def test_tree_includes_descendants_in_other_sessions(scraper_process):
+    process, grandchild = scraper_process
+    assert os.getsid(grandchild) != os.getsid(process.pid)
+    assert set(build.process_tree(process.pid)) >= {process.pid, grandchild}
+    assert build.tree_rss_mb(process.pid) > build.tree_rss_mb(grandchild) > 0
+
+
+def test_kill_tree_takes_the_browser_along(scraper_process):
+    process, grandchild = scraper_process
+    build.kill_tree(process)
+    assert not process.is_alive()
+    for _ in range(50):
+        if not alive(grandchild):
+            break
+        time.sleep(0.05)
+    assert not alive(grandchild)
@@ -0,0 +1,95 @@
+import importlib
+import sys
+
+import pytest
+
+from scrapers import utils
+
+PARSER_SOURCE = '''
+def parse_time(text):
+    return text.strip()
+
+
+def parse(html):
+    return [parse_time(part) for part in html.split({selector!r})]
+'''
+
+
+@pytest.fixture
+def parser_module(tmp_path, monkeypatch):
+    """Write a scraper-like module to disk and return a loader for it."""
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def load(source, name='fake_parser'):
+        (tmp_path / f'{name}.py').write_text(source)
+        sys.modules.pop(name, None)
+        importlib.invalidate_caches()
+        return importlib.import_module(name)
+
+    yield load
+    sys.modules.pop('fake_parser', None)
+
+
+@pytest.fixture(autouse=True)
+def empty_parse_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, 'PARSE_CACHE_FILE', tmp_path / 'parse_cache.json')
+    monkeypatch.setattr(utils, '_parse_cache', None)
+    monkeypatch.setattr(utils, '_parse_cache_touched', set())
+    utils.parser_fingerprint.cache_clear()
+
+
+def digest(module):
+    utils.parser_fingerprint.cache_clear()
+    return utils._parse_digest('<html>', module.parse, ())
+
+
+def test_changed_selector_string_invalidates(parser_module):
+    before = digest(parser_module(PARSER_SOURCE.format(selector='graybar_')))
+    after = digest(parser_module(PARSER_SOURCE.format(selector='greybar_')))
+    assert before != after
+
+
+def test_changed_helper_invalidates(parser_module):
+    source = PARSER_SOURCE.format(selector='|')
+    before = digest(parser_module(source))
+    after = digest(parser_module(source.replace('text.strip()', 'text.strip().upper()')))
+    assert before != after
+
+
+def test_unchanged_parser_keeps_digest(parser_module):
+    source = PARSER_SOURCE.format(selector='|')
+    assert digest(parser_module(source)) == digest(parser_module(source))
+
+
+def test_digest_depends_on_content_and_args(parser_module):
+    module = parser_module(PARSER_SOURCE.format(selector='|'))
+    assert utils._parse_digest('<a>', module.parse, ()) != utils._parse_digest('<b>', module.parse, ())
+    assert utils._parse_digest('<a>', module.parse, (1,)) != utils._parse_digest('<a>', module.parse, (2,))
+
+
+def test_fallback_without_source_covers_constants():
+    namespace = {}
+    exec("def parse(html):\n    return html.split('graybar_')", {'__name__': 'no_such_module'}, namespace)
+    first = namespace['parse']
+    exec("def parse(html):\n    return html.split('greybar_')", {'__name__': 'no_such_module'}, namespace)
+    second = namespace['parse']
+    assert utils.parser_fingerprint(first) != utils.parser_fingerprint(second)
+
+
+def test_parse_cached_reuses_until_parser_changes(parser_module):
+    calls = []
+    module = parser_module(PARSER_SOURCE.format(selector='|'))
+    original = module.parse
+
+    def counting(html):
+        calls.append(html)
+        return original(html)
+    counting.__module__, counting.__qualname__ = module.__name__, 'parse'
+
+    assert utils.parse_cached('url', 'a|b', counting) == ['a', 'b']
+    assert utils.parse_cached('url', 'a|b', counting) == ['a', 'b']
+    assert len(calls) == 1
+
+    changed = parser_module(PARSER_SOURCE.format(selector=','))
+    utils.parser_fingerprint.cache_clear()
+    assert utils.parse_cached('url', 'a|b', changed.parse) == ['a|b']
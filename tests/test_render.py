@@ -0,0 +1,75 @@
+import json
+import re
+import shutil
+import subprocess
+
+import pytest
+
+import build
+from conftest import day, screening
+
+
+def test_render_index_writes_only_the_page(tmp_path):
+    output = tmp_path / 'dev' / 'index.html'
+    build.render_index([screening(), screening('Fallen Angels', date=day(1))],
+                       build.template_env(build.TEMPLATE_DIR), output)
+
+    assert [p.name for p in tmp_path.rglob('*') if p.is_file()] == ['index.html']
+    html = output.read_text()
+    assert 'Chungking Express' in html and 'Fallen Angels' in html
+    assert 'href="styles.css"' in html
+
+
+def test_film_slug_is_capped_and_stays_distinct():
+    long_title = 'The Incredibly Strange Creatures Who Stopped Living and Became Mixed-Up Zombies ' * 4
+    a = build.film_slug(screening(long_title + 'Part One'))
+    b = build.film_slug(screening(long_title + 'Part Two'))
+    assert len(a) <= build.FILM_SLUG_MAX and len(b) <= build.FILM_SLUG_MAX
+    assert a != b
+    assert build.film_slug(screening('Chungking Express')) == 'chungking-express-1994'
+
+
+def test_film_slugs_resolve_clashes_in_favour_of_letterboxd():
+    listed = screening('Dune', year=2021)
+    enriched = screening('Dune: Part One', year=2021,
+                         letterboxd={'letterboxd_url': 'https://letterboxd.com/film/dune-2021/'})
+    slugs = build.film_slugs([listed, enriched])
+    assert slugs[build.film_key(enriched)] == 'dune-2021'
+    assert slugs[build.film_key(listed)].startswith('dune-2021-')
+    assert len(set(slugs.values())) == 2
+
+
+def test_film_pages_for_long_titles(tmp_path):
+    movies = [screening('An Extremely Long Restoration Title ' * 12), screening()]
+    build.generate_film_pages(build.template_env(build.TEMPLATE_DIR), movies, tmp_path, '',
+                              {'styles.css': 'styles.css'})
+    assert len(list((tmp_path / build.FILMS_DIR).glob('*.html'))) == 2
+
+
+FOLDING_SAMPLES = [
+    'Amélie', 'Nosferatu — Eine Symphonie des Grauens', 'Ｆｕｌｌｗｉｄｔｈ Ⅱ', 'Coté Jardin',
+    'a⃝b', 'e᷄x', 'Ångström', 'İstanbul', 'ﬁlm noir', 'Đorđe', '8½ Women',
+]
+
+
+def test_search_words_drop_every_combining_mark():
+    assert build.search_words('Amélie') == ['amelie']
+    # An enclosing mark (category Me, combining class 0) must not split the word
+    assert build.search_words('a⃝b') == ['ab']
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='needs node')
+def test_search_box_folds_like_the_index():
+    template = (build.TEMPLATE_DIR / 'index_template.html').read_text()
+    words_js = re.search(r'const words = .*;', template).group(0)
+    script = f"{words_js}\nconsole.log(JSON.stringify({json.dumps(FOLDING_SAMPLES)}.map(words)));"
+    output = subprocess.run(['node', '-e', script], capture_output=True, text=True, check=True).stdout
+    assert json.loads(output) == [build.search_words(text) for text in FOLDING_SAMPLES]
+
+
+def test_non_latin_titles_get_their_own_pages():
+    tokyo, late_spring = screening('東京物語', year=1953), screening('晩春', year=1953)
+    assert build.film_key(tokyo) != build.film_key(late_spring)
+    slugs = build.film_slugs([tokyo, late_spring, screening('東京物語', year=1953, theater='Facets')])
+    assert len(set(slugs.values())) == 2
+    assert all(slug.startswith('film-') and slug.endswith('-1953') for slug in slugs.values())
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from conftest import reset_lookup_state
+from scrapers import catalog, letterboxd
+
+pytestmark = pytest.mark.usefixtures('empty_stores')
+
+
+def shard_lookup(monkeypatch, title, slug):
+    """Run one lookup in a held-writes shard and return what it hands back."""
+    reset_lookup_state(monkeypatch)
+    letterboxd.hold_writes()
+    info = {'title': title, 'url': f'https://letterboxd.com/film/{slug}/'}
+    letterboxd.store_result(title, info)
+    catalog.add_film(slug, title, info=info)
+    return letterboxd.take_new_entries()
+
+
+def test_shards_write_nothing_themselves(monkeypatch):
+    shard_lookup(monkeypatch, 'Vertigo', 'vertigo')
+    assert not letterboxd.CACHE_FILE.exists()
+    assert not catalog.CATALOG_FILE.exists()
+
+
+def test_parent_merges_every_shard(monkeypatch):
+    first = shard_lookup(monkeypatch, 'Vertigo', 'vertigo')
+    second = shard_lookup(monkeypatch, 'Stalker', 'stalker')
+
+    reset_lookup_state(monkeypatch)
+    letterboxd.merge_new_entries(first)
+    letterboxd.merge_new_entries(second)
+
+    cache = json.loads(letterboxd.CACHE_FILE.read_text())
+    assert set(cache) == {'Vertigo', 'Stalker'}
+    films = json.loads(catalog.CATALOG_FILE.read_text())['films']
+    assert set(films) == {'vertigo', 'stalker'}
+
+
+def test_saves_keep_entries_written_by_another_process(monkeypatch):
+    letterboxd.store_result('Vertigo', None)
+    catalog.add_film('vertigo', 'Vertigo', 1958)
+    letterboxd.save_lookups()
+
+    # A process that loaded both files before those writes
+    monkeypatch.setattr(letterboxd, '_cache', {})
+    monkeypatch.setattr(catalog, '_films', {})
+    monkeypatch.setattr(catalog, '_by_title', {})
+    monkeypatch.setattr(catalog, '_by_word', {})
+    letterboxd.store_result('Stalker', None)
+    catalog.add_film('stalker', 'Stalker', 1979)
+    letterboxd.save_lookups()
+
+    assert set(json.loads(letterboxd.CACHE_FILE.read_text())) == {'Vertigo', 'Stalker'}
+    assert set(json.loads(catalog.CATALOG_FILE.read_text())['films']) == {'vertigo', 'stalker'}
+
+
+def test_multi_market_build_merges_every_shard(tmp_path, monkeypatch):
+    """build.py --markets with two markets, end to end through the process pool."""
+    import build
+    from conftest import screening
+
+    titles = {'chicago': 'Vertigo', 'milwaukee': 'Stalker'}
+
+    def fake_scrape(keys):
+        for key in keys:
+            market = key.split('_')[0]
+            yield key, [screening(titles[market], theater=f'{market} theater')], 0
+
+    def fake_fetch(title, year=None, director=None):
+        info = {'title': title, 'letterboxd_url': f'https://letterboxd.com/film/{title.lower()}/'}
+        letterboxd.store_result(letterboxd.cache_key_for(title, year), info)
+        catalog.add_film(title.lower(), title, year, info=info)
+        return info
+
+    monkeypatch.setattr(build, 'BASE_DIR', tmp_path)
+    monkeypatch.setattr(build, 'MARKET_KEYS', list(titles))
+    monkeypatch.setattr(build, 'market_dirs',
+                        lambda market: (tmp_path / 'data' / market, tmp_path / 'site' / market))
+    monkeypatch.setattr(build, 'market_scrapers', lambda market: [f'{market}_theater'])
+    monkeypatch.setattr(build, 'run_in_process', fake_scrape)
+    monkeypatch.setattr(build, 'generate_html', lambda *args, **kwargs: None)
+    monkeypatch.setattr(letterboxd, 'fetch_letterboxd_info', fake_fetch)
+
+    build.main(['--markets', 'chicago', 'milwaukee', '--jobs', '2'])
+
+    merged = json.loads((tmp_path / 'data' / 'markets.json').read_text())
+    assert sorted((m['market'], m['title']) for m in merged['movies']) == [
+        ('chicago', 'Vertigo'), ('milwaukee', 'Stalker')]
+    assert set(json.loads(letterboxd.CACHE_FILE.read_text())) == {'Vertigo|1994', 'Stalker|1994'}
+    assert set(json.loads(catalog.CATALOG_FILE.read_text())['films']) == {'vertigo', 'stalker'}
@@ -0,0 +1,49 @@
+from scrapers import utils
+
+
+def test_breaker_opens_after_threshold():
+    url = 'https://example.com/schedule'
+    for _ in range(utils.BREAKER_THRESHOLD - 1):
+        utils.record_failure(url)
+    assert not utils.circuit_open(url)
+
+    utils.record_failure(url)
+    assert utils.circuit_open(url)
+    assert utils.circuit_open('https://EXAMPLE.com/other-page')
+
+
+def test_breaker_is_per_host():
+    for _ in range(utils.BREAKER_THRESHOLD):
+        utils.record_failure('https://down.example.com/')
+    assert utils.circuit_open('https://down.example.com/')
+    assert not utils.circuit_open('https://up.example.com/')
+
+
+def test_success_resets_failure_count():
+    url = 'https://flaky.example.com/'
+    for _ in range(utils.BREAKER_THRESHOLD - 1):
+        utils.record_failure(url)
+    utils.record_success(url)
+    for _ in range(utils.BREAKER_THRESHOLD - 1):
+        utils.record_failure(url)
+    assert not utils.circuit_open(url)
+
+
+def test_reset_circuits_closes_breakers():
+    url = 'https://down.example.com/'
+    for _ in range(utils.BREAKER_THRESHOLD):
+        utils.record_failure(url)
+    utils.reset_circuits()
+    assert not utils.circuit_open(url)
+
+
+def test_make_request_skips_open_host(monkeypatch):
+    url = 'https://down.example.com/'
+    for _ in range(utils.BREAKER_THRESHOLD):
+        utils.record_failure(url)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('request sent to an open circuit')
+
+    monkeypatch.setattr(utils.get_session(), 'get', fail)
+    assert utils.make_request(url) is None